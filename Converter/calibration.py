@@ -0,0 +1,84 @@
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+import numpy as np
+
+from Converter.thermoexceptions import ThermoException
+
+
+class CalibrationRegistry:
+    """
+    Stores the individual calibration deviations of thermocouples keyed by sensor ID.
+    The deviation of a sensor is a polynomial of the temperature in degrees Celsius
+    ∆T = c0 + c1·t + c2·t² + ..., which is added to the temperature calculated by the standard table.
+    The coefficients of all sensors are kept in one array, rows are found through the sensor ID index.
+    Sensors without a calibration certificate get a zero deviation.
+    """
+
+    def __init__(self, file_path: Path | str):
+        self.file_path = Path(file_path)
+        self._index, self._coefficients = self._load_data()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, sensor_id: str):
+        return sensor_id in self._index
+
+    def _load_data(self) -> tuple[dict[str, int], np.ndarray]:
+        """
+        Loads the calibration coefficients from a file.
+        Each line contains the sensor ID and the coefficients of the deviation polynomial,
+        starting with the free term, lines starting with # are ignored.
+        It can throw a FileNotFoundError exception if the data file does not exist.
+        """
+        index = {}
+        rows = []
+        try:
+            with open(self.file_path, 'r') as file:
+                for number, line in enumerate(file, 1):
+                    if not line.strip() or line.lstrip().startswith('#'):
+                        continue
+                    sensor_id, *coefficients = line.split()
+                    if sensor_id in index:
+                        raise ThermoException(f'Duplicate sensor ID {sensor_id} in line {number}.')
+                    try:
+                        rows.append([float(Decimal(_.replace(',', '.'))) for _ in coefficients])
+                    except InvalidOperation:
+                        raise ThermoException(f'Incorrect calibration coefficients in line {number}.')
+                    index[sensor_id] = len(rows) - 1
+        except FileNotFoundError:
+            raise FileNotFoundError(f'The file - {self.file_path}  does not exist.')
+
+        # The last row is the zero deviation for sensors without a certificate.
+        coefficients = np.zeros((len(rows) + 1, max((len(_) for _ in rows), default=1) or 1))
+        for i, row in enumerate(rows):
+            coefficients[i, :len(row)] = row
+        coefficients.flags.writeable = False
+        return index, coefficients
+
+    def get_coefficients(self, sensor_id: str) -> np.ndarray:
+        """
+        Returns the coefficients of the deviation polynomial of the sensor.
+        """
+        return self._coefficients[self._index.get(sensor_id, -1)]
+
+    def get_deviation(self, sensor_ids: np.ndarray, temperature: np.ndarray) -> np.ndarray:
+        """
+        Returns the calibration deviations of the sensors at the given temperatures, in the shape of the temperatures.
+        The sensor IDs are broadcast against the temperatures, so the IDs of the columns
+        of a (samples, sensors) array can be given once.
+        Each distinct sensor ID is looked up in the index once per call,
+        the polynomials are evaluated for the whole array by Horner's scheme.
+        """
+        temperature = np.asarray(temperature, dtype=np.float64)
+        shape = temperature.shape
+        sensor_ids = np.broadcast_to(np.asarray(sensor_ids).astype(str), shape).ravel()
+        temperature = temperature.ravel()
+        unique, inverse = np.unique(sensor_ids, return_inverse=True)
+        rows = np.array([self._index.get(_, -1) for _ in unique.tolist()], dtype=np.intp)[inverse]
+
+        deviation = self._coefficients[rows, -1]
+        for k in range(self._coefficients.shape[1] - 2, -1, -1):
+            deviation = deviation * temperature + self._coefficients[rows, k]
+        return deviation.reshape(shape)
@@ -13,3 +13,14 @@ QUANTITY: int = 3
 TEMP_FREE_END: float = 22.0
 STANDARD_DEVIATION_TEMP_FREE_END: float = 0.5
 STANDARD_DEVIATION_TEMP: float = 1.4
+COVERAGE_FACTOR: float = 2.0
+SHEET_PAGE_SIZE: int = 50
+RELOAD_INTERVAL: float = 1.0
+TRACE_SAMPLE_RATE: float = 0.0
+TRACE_FILE: Path = CWD / Path('trace.json')
+MAX_TRACE_EVENTS: int = 100_000
+LOAD_CHANNELS: int = 8
+LOAD_RATE: float = 1000.0
+LOAD_CHUNK_SIZE: int = 1000
+# A measurement of the console input: the free end temperature and the thermo-emf separated by dashes.
+MEASUREMENT_PATTERN: str = r'(-?\d+[.]?\d*)\s*-+\s*(-?\d+[.]?\d*)'
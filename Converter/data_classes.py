@@ -1,5 +1,7 @@
 from dataclasses import dataclass
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
 
 
 @dataclass
@@ -35,3 +37,111 @@ class Result:
                 f'Correction: {self.correction} mV; '
                 f'Result thermo-emf: {self.result_thermo_emf} mV; '
                 f'Temperature: {self.temperature} °C')
+
+
+@dataclass
+class ResultBatch:
+    """
+    Stores the results of a batch calculation as columns with the same fields as Result,
+    in degrees Celsius and mV, respectively.
+    Points that could not be calculated contain NaN in the temperature column.
+    """
+    thermocouple: str
+    temperature_free_end: np.ndarray
+    thermo_emf: np.ndarray
+    correction: np.ndarray
+    result_thermo_emf: np.ndarray
+    temperature: np.ndarray
+
+    def __len__(self):
+        return len(self.temperature)
+
+    @property
+    def valid(self) -> np.ndarray:
+        """
+        Returns the mask of successfully calculated points.
+        """
+        return ~np.isnan(self.temperature)
+
+    def to_results(self) -> list[Result | str]:
+        """
+        Converts the batch to a list of Result objects,
+        points that could not be calculated are represented by an error message.
+        """
+        results = []
+        for i in range(len(self)):
+            if np.isnan(self.temperature[i]):
+                results.append(f'Input data error: the values of the point '
+                               f'are outside the range of the thermocouple conversion table.')
+                continue
+            correction = Decimal(repr(float(self.correction[i]))).quantize(Decimal('1.0000'), ROUND_HALF_UP)
+            thermo_emf = Decimal(repr(float(self.thermo_emf[i])))
+            results.append(Result(Decimal(repr(float(self.temperature_free_end[i]))),
+                                  thermo_emf, correction, correction + thermo_emf,
+                                  Decimal(repr(float(self.temperature[i]))).quantize(Decimal('1.0'),
+                                                                                    ROUND_HALF_UP)))
+        return results
+
+
+@dataclass
+class UncertaintyBatch:
+    """
+    Stores the expected temperatures of a batch of measurements with their standard uncertainties
+    and coverage intervals for the coverage factor, in degrees Celsius.
+    Points that could not be calculated contain NaN.
+    """
+    thermocouple: str
+    temperature: np.ndarray
+    uncertainty: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    coverage_factor: float
+
+    def __len__(self):
+        return len(self.temperature)
+
+
+@dataclass
+class Window:
+    """
+    Stores the aggregated values of the points of a time window,
+    the window covers the timestamps from start inclusive to end exclusive.
+    """
+    start: float
+    end: float
+    count: int
+    mean: float
+    min: float
+    max: float
+    delta: float
+
+    def __str__(self):
+        return (f'Window: {self.start} - {self.end}; Points: {self.count}; '
+                f'Mean: {self.mean}; Min: {self.min}; Max: {self.max}; ∆: {self.delta}')
+
+
+@dataclass
+class LoadReport:
+    """
+    Stores the results of a load test: sustained throughput in samples per second
+    over the wall-clock duration of consuming the stream, latencies of the calls in milliseconds,
+    peak memory use in MB and the number of lines of the stream without measurements.
+    """
+    mode: str
+    samples: int
+    calls: int
+    errors: int
+    skipped: int
+    duration: float
+    throughput: float
+    latency_p50: float
+    latency_p99: float
+    peak_memory: float | None
+
+    def __str__(self):
+        memory = f'{self.peak_memory:.1f} MB' if self.peak_memory is not None else 'n/a'
+        return (f'Mode: {self.mode}; Samples: {self.samples}; Calls: {self.calls}; Errors: {self.errors}; '
+                f'Skipped lines: {self.skipped}; '
+                f'Duration: {self.duration:.3f} s; Throughput: {self.throughput:.0f} samples/s; '
+                f'Latency p50: {self.latency_p50:.3f} ms; Latency p99: {self.latency_p99:.3f} ms; '
+                f'Peak memory: {memory}')
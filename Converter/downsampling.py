@@ -0,0 +1,217 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+from Converter.data_classes import ResultBatch, Window
+from Converter.teconverter import TEConverter
+from Converter.thermoexceptions import ThermoException
+
+
+class _Stage(ABC):
+    """
+    The base class of the downsampling stages.
+    Accumulates the valid points of the selected field of the batches
+    until they are no longer needed for the output.
+    The timestamps of the points must not decrease from chunk to chunk.
+    """
+
+    def __init__(self, field: str = 'temperature'):
+        if field not in ResultBatch.__annotations__ or field == 'thermocouple':
+            raise ThermoException(f'The field {field} is not a column of the batch.')
+        self.field = field
+        self._times = np.empty(0)
+        self._values = np.empty(0)
+
+    def _append(self, timestamps: np.ndarray, batch: ResultBatch):
+        """
+        Adds the valid points of the batch to the buffer.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if len(timestamps) != len(batch):
+            raise ThermoException(f'The number of timestamps {len(timestamps)} '
+                                  f'does not match the size of the batch {len(batch)}.')
+        values = getattr(batch, self.field)
+        valid = batch.valid & ~np.isnan(values)
+        self._times = np.concatenate((self._times, timestamps[valid]))
+        self._values = np.concatenate((self._values, values[valid]))
+
+    @abstractmethod
+    def feed(self, timestamps: np.ndarray, batch: ResultBatch) -> list:
+        """
+        Adds a chunk of converted points and returns the output that is ready.
+        """
+
+    @abstractmethod
+    def flush(self) -> list:
+        """
+        Returns the output of the remaining points.
+        """
+
+
+class WindowAggregator(_Stage):
+    """
+    Aggregates the points into time windows of the given size in seconds.
+    Windows follow each other with the given step, fixed windows if the step is equal to the size,
+    sliding windows if it is smaller. Windows without points are skipped.
+    """
+
+    def __init__(self, size: float, step: float | None = None, field: str = 'temperature'):
+        super().__init__(field)
+        step = size if step is None else step
+        if not 0 < step <= size:
+            raise ThermoException(f'The step of the windows should be in the range from 0 to {size}. '
+                                  f'Current step: {step}.')
+        self.size = size
+        self.step = step
+        self._origin: float | None = None
+        self._next = 0
+
+    def _get_indices(self, last: int) -> np.ndarray:
+        """
+        Returns the indices of the windows from the next one to the last one, not inclusive,
+        that can contain buffered points, in increasing order.
+        """
+        # A point gets into the window of its step and the windows before it within the size,
+        # one more window on each side covers the rounding of the starts of the windows.
+        count = int(np.ceil(self.size / self.step)) + 2
+        ends = np.unique(np.floor((self._times - self._origin) / self.step).astype(np.int64)) + 1
+        # Windows shared with the previous point are taken once.
+        counts = np.minimum(np.diff(ends, prepend=ends[:1] - count), count)
+        offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        indices = np.repeat(ends - counts + 1, counts) + offsets
+        return indices[(indices >= self._next) & (indices < last)]
+
+    def _aggregate(self, last: int) -> list[Window]:
+        """
+        Aggregates the windows from the next one to the last one, not inclusive,
+        and removes the points that will not get into the following windows.
+        Only the windows around the buffered points are visited, so gaps in the timestamps cost nothing.
+        """
+        starts = self._origin + self._get_indices(last) * self.step
+        lo = np.searchsorted(self._times, starts, side='left')
+        hi = np.searchsorted(self._times, starts + self.size, side='left')
+        sums = np.concatenate(([0.0], np.cumsum(self._values)))
+
+        windows = []
+        for start, i, j in zip(starts.tolist(), lo.tolist(), hi.tolist()):
+            if i == j:
+                continue
+            min_value, max_value = float(self._values[i:j].min()), float(self._values[i:j].max())
+            windows.append(Window(start, start + self.size, j - i, float((sums[j] - sums[i]) / (j - i)),
+                                  min_value, max_value, max_value - min_value))
+
+        self._next = last
+        keep = np.searchsorted(self._times, self._origin + last * self.step, side='left')
+        self._times, self._values = self._times[keep:], self._values[keep:]
+        return windows
+
+    def feed(self, timestamps: np.ndarray, batch: ResultBatch) -> list[Window]:
+        """
+        Adds a chunk of converted points and returns the windows that were completed by it.
+        """
+        if not len(batch):
+            return []
+        if self._origin is None:
+            self._origin = float(timestamps[0])
+        self._append(timestamps, batch)
+        # The window is completed when the chunk reaches its end.
+        last = int(np.floor((float(timestamps[-1]) - self._origin - self.size) / self.step)) + 1
+        return self._aggregate(last) if last > self._next else []
+
+    def flush(self) -> list[Window]:
+        """
+        Returns the remaining incomplete windows.
+        """
+        if not len(self._times):
+            return []
+        last = int(np.floor((self._times[-1] - self._origin) / self.step)) + 1
+        return self._aggregate(max(last, self._next))
+
+
+class LTTBDecimator(_Stage):
+    """
+    Decimates the points for plotting by the Largest-Triangle-Three-Buckets algorithm,
+    one point is selected from each bucket of the given number of points,
+    the first and the last points are always kept.
+    """
+
+    def __init__(self, bucket_size: int, field: str = 'temperature'):
+        super().__init__(field)
+        if bucket_size < 1:
+            raise ThermoException(f'The bucket size should be positive. Current bucket size: {bucket_size}.')
+        self.bucket_size = bucket_size
+        self._selected: tuple[float, float] | None = None
+
+    def _select(self, count: int, end: tuple[float, float] | None = None) -> list[tuple[float, float]]:
+        """
+        Selects points from the given number of buffered buckets,
+        the average of the bucket following each of them is used as the third vertex of the triangle,
+        the end point is used instead for the last bucket in the buffer.
+        """
+        points = []
+        for _ in range(count):
+            size = self.bucket_size
+            times, values = self._times[:size], self._values[:size]
+            next_times, next_values = self._times[size:2 * size], self._values[size:2 * size]
+            if len(next_times):
+                avg_time, avg_value = next_times.mean(), next_values.mean()
+            else:
+                avg_time, avg_value = end
+            prev_time, prev_value = self._selected
+            areas = np.abs((prev_time - avg_time) * (values - prev_value)
+                           - (prev_time - times) * (avg_value - prev_value))
+            index = int(np.argmax(areas))
+            self._selected = (float(times[index]), float(values[index]))
+            points.append(self._selected)
+            self._times, self._values = self._times[size:], self._values[size:]
+        return points
+
+    def feed(self, timestamps: np.ndarray, batch: ResultBatch) -> list[tuple[float, float]]:
+        """
+        Adds a chunk of converted points and returns the selected points
+        of the buckets that are followed by a complete bucket.
+        """
+        self._append(timestamps, batch)
+        points = []
+        if self._selected is None and len(self._times):
+            self._selected = (float(self._times[0]), float(self._values[0]))
+            points.append(self._selected)
+            self._times, self._values = self._times[1:], self._values[1:]
+        if self._selected is not None:
+            points.extend(self._select(len(self._times) // self.bucket_size - 1))
+        return points
+
+    def flush(self) -> list[tuple[float, float]]:
+        """
+        Returns the selected points of the remaining buckets and the last point.
+        """
+        if not len(self._times):
+            return []
+        last = (float(self._times[-1]), float(self._values[-1]))
+        self._times, self._values = self._times[:-1], self._values[:-1]
+        points = self._select(-(-len(self._times) // self.bucket_size), last)
+        points.append(last)
+        self._selected = last
+        return points
+
+
+def convert_stream(converter: TEConverter,
+                   chunks: Iterable[tuple[np.ndarray, np.ndarray, np.ndarray]]) -> Iterator[tuple[np.ndarray, ResultBatch]]:
+    """
+    Converts chunks of timestamps, free end temperatures and thermo-emf
+    into pairs of timestamps and batches of results.
+    """
+    for timestamps, temperature_free_end, thermo_emf in chunks:
+        yield timestamps, converter.calculate_batch(temperature_free_end, thermo_emf)
+
+
+def downsample(stream: Iterable[tuple[np.ndarray, ResultBatch]],
+               stage: WindowAggregator | LTTBDecimator) -> Iterator[Window | tuple[float, float]]:
+    """
+    Passes the converted chunks through the downsampling stage,
+    yields its output as soon as it is ready, so that only the output is kept in memory.
+    """
+    for timestamps, batch in stream:
+        yield from stage.feed(timestamps, batch)
+    yield from stage.flush()
@@ -0,0 +1,145 @@
+from pathlib import Path
+
+import numpy as np
+
+from Converter.data_classes import Result, ResultBatch
+from Converter.thermocouple_table import round_half_up
+from Converter.thermoexceptions import ThermoException
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+FIELDS: tuple[str, ...] = tuple(Result.__annotations__)
+UNITS: dict[str, str] = {
+    'temperature_free_end': '°C',
+    'thermo_emf': 'mV',
+    'correction': 'mV',
+    'result_thermo_emf': 'mV',
+    'temperature': '°C',
+}
+CSV_DECIMALS: dict[str, int] = {
+    'temperature_free_end': 3,
+    'thermo_emf': 6,
+    'correction': 4,
+    'result_thermo_emf': 6,
+    'temperature': 1,
+}
+CHUNK_SIZE: int = 1_000_000
+
+# The characters of all four-digit groups packed into 32-bit words, so that digits are extracted four at a time.
+_DIGIT_GROUPS: np.ndarray = np.frombuffer(b''.join(f'{_:04}'.encode() for _ in range(10000)), dtype=np.uint32)
+
+
+def export_npy(batch: ResultBatch, file_path: Path | str) -> None:
+    """
+    Exports the batch to a .npy file as a structured array with the fields of Result.
+    The titles of the fields contain the type of thermocouple and the units.
+    The columns are copied into the memory-mapped file one by one.
+    """
+    dtype = np.dtype({'names': list(FIELDS), 'formats': [np.float64] * len(FIELDS),
+                      'titles': [f'{batch.thermocouple}: {_}, {UNITS[_]}' for _ in FIELDS]})
+    array = np.lib.format.open_memmap(file_path, mode='w+', dtype=dtype, shape=(len(batch),), version=(3, 0))
+    for field in FIELDS:
+        array[field] = getattr(batch, field)
+    array.flush()
+    del array
+
+
+def export_npz(batch: ResultBatch, file_path: Path | str, compressed: bool = False) -> None:
+    """
+    Exports the batch to a .npz file with an array for each field of Result
+    and the type of thermocouple in the thermocouple array.
+    """
+    save = np.savez_compressed if compressed else np.savez
+    save(file_path, thermocouple=np.array(batch.thermocouple), **{_: getattr(batch, _) for _ in FIELDS})
+
+
+def _format_column(values: np.ndarray, decimals: int) -> np.ndarray:
+    """
+    Formats the values with a fixed number of decimal places into a matrix of bytes, a row for each value.
+    Zero bytes fill the unused positions, NaN values consist of zero bytes only.
+    """
+    nan = np.isnan(values)
+    scaled = round_half_up(np.abs(np.where(nan, 0.0, values)), decimals) * 10 ** decimals
+    integers = np.rint(scaled).astype(np.int64)
+    width = max(len(str(int(integers.max(initial=0)))), decimals + 1)
+
+    count = -(-width // 4)
+    groups = np.empty((len(values), count), dtype=np.uint32)
+    rest = integers
+    for i in range(count - 1, -1, -1):
+        groups[:, i] = _DIGIT_GROUPS[rest % 10000]
+        rest = rest // 10000
+    digits = groups.view(np.uint8)[:, -width:]
+    # Leading zeros are dropped, except for the one before the decimal point.
+    head = width - decimals - 1
+    digits[:, :head][integers[:, None] < 10 ** np.arange(width - 1, width - 1 - head, -1, dtype=np.int64)] = 0
+
+    column = np.zeros((len(values), width + 2 if decimals else width + 1), dtype=np.uint8)
+    column[:, 0] = np.where((values < 0) & (scaled > 0), ord('-'), 0)
+    column[:, 1:width - decimals + 1] = digits[:, :width - decimals]
+    if decimals:
+        column[:, -decimals - 1] = ord('.')
+        column[:, -decimals:] = digits[:, width - decimals:]
+    column[nan] = 0
+    return column
+
+
+def export_csv(batch: ResultBatch, file_path: Path | str,
+               decimals: dict[str, int] | None = None, chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Exports the batch to a CSV file with a column for each field of Result,
+    the type of thermocouple is written in the comment line before the header.
+    The rows are formatted and written in chunks by array operations,
+    points that could not be calculated have empty values.
+    """
+    decimals = CSV_DECIMALS | (decimals or {})
+    with open(file_path, 'wb') as file:
+        file.write(f'# thermocouple: {batch.thermocouple}\n{",".join(FIELDS)}\n'.encode())
+        for start in range(0, len(batch), chunk_size):
+            columns = [_format_column(getattr(batch, _)[start:start + chunk_size], decimals[_]) for _ in FIELDS]
+            rows = np.empty((len(columns[0]), sum(_.shape[1] + 1 for _ in columns)), dtype=np.uint8)
+            position = 0
+            for column in columns:
+                rows[:, position:position + column.shape[1]] = column
+                position += column.shape[1] + 1
+                rows[:, position - 1] = ord(',')
+            rows[:, -1] = ord('\n')
+            rows = rows.ravel()
+            file.write(rows[rows != 0].tobytes())
+
+
+def export_parquet(batch: ResultBatch, file_path: Path | str, chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Exports the batch to a Parquet file with a column for each field of Result
+    and the type of thermocouple in the metadata of the schema.
+    Requires the pyarrow package.
+    """
+    if pyarrow is None:
+        raise ImportError('Exporting to Parquet requires the pyarrow package.')
+    table = pyarrow.table({_: getattr(batch, _) for _ in FIELDS},
+                          metadata={'thermocouple': batch.thermocouple})
+    pyarrow.parquet.write_table(table, file_path, row_group_size=chunk_size)
+
+
+EXPORTERS = {
+    '.npy': export_npy,
+    '.npz': export_npz,
+    '.csv': export_csv,
+    '.parquet': export_parquet,
+}
+
+
+def export(batch: ResultBatch, file_path: Path | str) -> None:
+    """
+    Exports the batch to a file in the format given by its extension.
+    """
+    suffix = Path(file_path).suffix.lower()
+    if suffix not in EXPORTERS:
+        raise ThermoException(f'The file format {suffix} is not supported. '
+                              f'Supported formats: {", ".join(EXPORTERS)}.')
+    EXPORTERS[suffix](batch, file_path)
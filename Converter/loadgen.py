@@ -0,0 +1,188 @@
+import re
+import socket
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import TextIO
+
+import numpy as np
+
+from Converter.constants import (LOAD_CHANNELS, LOAD_CHUNK_SIZE, LOAD_RATE, MEASUREMENT_PATTERN,
+                                 STANDARD_DEVIATION_TEMP, STANDARD_DEVIATION_TEMP_FREE_END, TEMP_FREE_END)
+from Converter.thermocouple_table import ThermocoupleTable
+
+
+class LoadGenerator:
+    """
+    Generates multi-channel measurement streams with the Gaussian model of TEConverter.generate:
+    the temperature of each channel and the free end temperature are normally distributed
+    around their mean values, which drift linearly with time, in °C/s,
+    and are clipped to the range of the table, so that only bursts are out of range.
+    The thermo-emf is not negative: a channel colder than the free end reads zero.
+    Out-of-range bursts replace the thermo-emf of a channel with values outside the table
+    for a number of samples, a burst starts at a sample with the given probability.
+    """
+
+    def __init__(self, table: ThermocoupleTable, temperature: float, channels: int = LOAD_CHANNELS,
+                 rate: float = LOAD_RATE, std_temp: float = STANDARD_DEVIATION_TEMP,
+                 temp_free_end: float = TEMP_FREE_END, std_free_end: float = STANDARD_DEVIATION_TEMP_FREE_END,
+                 drift: float = 0.0, burst_probability: float = 0.0, burst_length: int = 10,
+                 seed: int | None = None):
+        self.table = table
+        self.temperature = temperature
+        self.channels = channels
+        self.rate = rate
+        self.std_temp = std_temp
+        self.temp_free_end = temp_free_end
+        self.std_free_end = std_free_end
+        self.drift = drift
+        self.burst_probability = burst_probability
+        self.burst_length = burst_length
+        self._random = np.random.default_rng(seed)
+        self._sample = 0
+        self._burst = np.zeros(channels, dtype=np.int64)
+
+    def generate(self, samples: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Generates the next samples of all channels.
+        Returns the timestamps of the samples, in seconds, and the free end temperatures and thermo-emf
+        of the channels, as arrays of the shape (samples, channels).
+        """
+        timestamps = (self._sample + np.arange(samples)) / self.rate
+        self._sample += samples
+        shape = (samples, self.channels)
+        drift = (self.drift * timestamps)[:, None]
+        upper = len(self.table) - 1
+        temperature = np.clip(np.round(self._random.normal(self.temperature, self.std_temp, shape) + drift, 1),
+                              0, upper)
+        temperature_free_end = np.clip(np.round(self._random.normal(self.temp_free_end, self.std_free_end, shape), 1),
+                                       0, upper)
+        thermo_emf = self.table.get_thermo_emf_array(temperature) - self.table.get_thermo_emf_array(temperature_free_end)
+        # Not below zero, since the console format cannot carry the sign of the thermo-emf.
+        return timestamps, temperature_free_end, np.maximum(np.round(thermo_emf, 4), 0.0)
+
+    def _add_bursts(self, thermo_emf: np.ndarray) -> None:
+        """
+        Replaces the thermo-emf of the samples in bursts with values outside the range of the table,
+        bursts that do not end in this chunk continue in the next one.
+        """
+        if not self.burst_probability:
+            return
+        samples, length = len(thermo_emf), self.burst_length
+        starts = self._random.random(thermo_emf.shape) < self.burst_probability
+        counts = np.cumsum(starts, axis=0)
+        # The number of bursts started in the last burst_length samples.
+        started = counts - np.concatenate((np.zeros((length, self.channels), dtype=counts.dtype), counts))[:samples]
+        bursts = (started > 0) | (np.arange(samples)[:, None] < self._burst)
+        # Above the table, since the console format cannot carry the sign of the thermo-emf.
+        limit = float(self.table.get_curve()[1][-1])
+        thermo_emf[bursts] = limit + 1.0 + self._random.random(int(bursts.sum()))
+
+        last = samples - 1 - np.argmax(starts[::-1], axis=0)
+        remaining = np.where(starts.any(axis=0), length - (samples - last), 0)
+        self._burst = np.maximum(np.maximum(remaining, self._burst - samples), 0)
+
+    def chunks(self, duration: float,
+               chunk_size: int = LOAD_CHUNK_SIZE) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Yields chunks of samples for the given duration of the stream, in seconds.
+        """
+        total = int(duration * self.rate)
+        for start in range(0, total, chunk_size):
+            timestamps, temperature_free_end, thermo_emf = self.generate(min(chunk_size, total - start))
+            self._add_bursts(thermo_emf)
+            yield timestamps, temperature_free_end, thermo_emf
+
+
+def format_lines(temperature_free_end: np.ndarray, thermo_emf: np.ndarray) -> str:
+    """
+    Formats the samples as lines of the console calculate command,
+    one line per sample with the measurements of all channels like this: 22.4-0.1274 22.5-0.1281.
+    """
+    return ''.join(' '.join(f'{t:.1f}-{e:.4f}' for t, e in zip(row_t, row_e)) + '\n'
+                   for row_t, row_e in zip(temperature_free_end.tolist(), thermo_emf.tolist()))
+
+
+def parse_lines(lines: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parses lines written by format_lines back into flat arrays of the free end temperatures and the thermo-emf,
+    in the same way as the console input is parsed.
+    """
+    values = np.array(re.findall(MEASUREMENT_PATTERN, '\n'.join(lines).replace(',', '.')), dtype=np.float64)
+    if not len(values):
+        return np.empty(0), np.empty(0)
+    return values[:, 0], values[:, 1]
+
+
+def read_chunks(lines: Iterable[str], chunk_size: int = LOAD_CHUNK_SIZE) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    Yields the samples of the lines of a stream parsed in chunks of the given number of lines.
+    """
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield parse_lines(chunk)
+            chunk = []
+    if chunk:
+        yield parse_lines(chunk)
+
+
+@contextmanager
+def open_sink(target: str) -> Iterator[TextIO]:
+    """
+    Opens the output of the stream: - for the standard output (a pipe),
+    tcp://host:port for a local socket, otherwise the path of a file.
+    """
+    if target == '-':
+        yield sys.stdout
+    elif target.startswith('tcp://'):
+        host, port = target[len('tcp://'):].rsplit(':', 1)
+        with socket.create_connection((host, int(port))) as connection:
+            with connection.makefile('w', encoding='utf-8') as file:
+                yield file
+    else:
+        with open(target, 'w', encoding='utf-8') as file:
+            yield file
+
+
+def emit(generator: LoadGenerator, target: str, duration: float,
+         realtime: bool = False, chunk_size: int = LOAD_CHUNK_SIZE) -> int:
+    """
+    Writes the stream to the target, pacing it at the rate of the generator in realtime mode.
+    Returns the number of written samples.
+    """
+    samples = 0
+    start = time.perf_counter()
+    with open_sink(target) as sink:
+        for timestamps, temperature_free_end, thermo_emf in generator.chunks(duration, chunk_size):
+            if realtime:
+                delay = start + timestamps[0] - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            sink.write(format_lines(temperature_free_end, thermo_emf))
+            samples += len(timestamps)
+        sink.flush()
+    return samples
+
+
+@contextmanager
+def open_source(source: str) -> Iterator[TextIO]:
+    """
+    Opens the input of a stream written by emit: - for the standard input (a pipe),
+    tcp://host:port to accept one connection on a local socket, otherwise the path of a file.
+    Returns when the stream has data, so the start of the producer is not counted as the time of the stream.
+    """
+    if source == '-':
+        sys.stdin.buffer.peek(1)
+        yield sys.stdin
+    elif source.startswith('tcp://'):
+        host, port = source[len('tcp://'):].rsplit(':', 1)
+        with socket.create_server((host, int(port))) as server:
+            connection, _ = server.accept()
+            with connection, connection.makefile('r', encoding='utf-8') as file:
+                yield file
+    else:
+        with open(source, 'r', encoding='utf-8') as file:
+            yield file
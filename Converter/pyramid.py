@@ -0,0 +1,62 @@
+import numpy as np
+
+from Converter.thermoexceptions import ThermoException
+
+
+class MinMaxPyramid:
+    """
+    A multi-resolution min/max pyramid of a series for drawing it at any zoom
+    with about as many points as there are pixels.
+    Level 0 holds the values of the series, each next level holds the minimums and maximums
+    of pairs of bins of the previous one, so a bin of level k covers 2**k points.
+    The x values must be sorted, NaN values of the series are skipped.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        self.x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if self.x.shape != y.shape:
+            raise ThermoException(f'The sizes of the x values {len(self.x)} and the series {len(y)} do not match.')
+        self._levels = [(y, y)]
+        mins, maxs = y, y
+        while len(mins) > 1:
+            if len(mins) % 2:
+                mins, maxs = np.append(mins, mins[-1]), np.append(maxs, maxs[-1])
+            mins, maxs = np.fmin(mins[0::2], mins[1::2]), np.fmax(maxs[0::2], maxs[1::2])
+            self._levels.append((mins, maxs))
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def levels(self) -> int:
+        """
+        Returns the number of levels of the pyramid.
+        """
+        return len(self._levels)
+
+    def get_range(self) -> tuple[float, float, float, float]:
+        """
+        Returns the ranges of the x values and the series: x min, x max, y min, y max.
+        """
+        mins, maxs = self._levels[-1]
+        return float(self.x[0]), float(self.x[-1]), float(mins[0]), float(maxs[0])
+
+    def query(self, x_min: float, x_max: float, pixels: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the points for drawing the series between x_min and x_max on the given number of pixels.
+        If there are more points than twice the pixels, the level with the fewest bins that is still
+        at least as many as the pixels is used: each bin gives its minimum and maximum
+        at the x value of its first point, which draws the envelope of the series.
+        """
+        start = max(int(np.searchsorted(self.x, x_min, side='left')) - 1, 0)
+        stop = min(int(np.searchsorted(self.x, x_max, side='right')) + 1, len(self.x))
+        level = max(int(np.log2(max(stop - start, 1) / max(pixels, 1))), 0)
+        if level == 0:
+            return self.x[start:stop], self._levels[0][0][start:stop]
+
+        first, last = start >> level, ((stop - 1) >> level) + 1
+        mins, maxs = self._levels[level]
+        x = self.x[np.arange(first, last) << level]
+        y = np.column_stack((mins[first:last], maxs[first:last])).ravel()
+        return np.repeat(x, 2), y
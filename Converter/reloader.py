@@ -0,0 +1,123 @@
+import os
+from threading import Event, Lock, Thread
+from weakref import WeakSet
+
+from Converter.constants import RELOAD_INTERVAL, THERMOCOUPLES
+from Converter.teconverter import TEConverter
+from Converter.thermocouple_table import ThermocoupleTable, get_published_table, get_table, publish_table
+from Converter.thermoexceptions import ThermoException
+
+
+class TableWatcher:
+    """
+    Watches the data files of the thermocouples by polling their modification times
+    and replaces the tables of the registered converters when the contents of a file change.
+    A new table is published and used only if it is valid: it has the same number of values as the table
+    it replaces and its thermo-emf values increase, except where they do not increase in the table it replaces.
+    If there is no table to replace, because the data file could not be loaded before, all values should increase.
+    Errors of the last check of each thermocouple are kept in the errors dictionary,
+    get_new_errors returns the ones that have not been shown to the operator yet.
+    """
+
+    def __init__(self, interval: float = RELOAD_INTERVAL):
+        self.interval = interval
+        self.errors: dict[str, str] = {}
+        self._reported: set[str] = set()
+        self._converters: WeakSet[TEConverter] = WeakSet()
+        self._mtimes: dict[str, int] = {}
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Thread | None = None
+        for thermocouple in THERMOCOUPLES:
+            self._mtimes[thermocouple] = self._get_mtime(thermocouple)
+            try:
+                get_table(thermocouple)
+            except (ThermoException, OSError, ValueError, ArithmeticError):
+                pass
+
+    @staticmethod
+    def _get_mtime(thermocouple: str) -> int:
+        """
+        Returns the modification time of the data file of the thermocouple, or -1 if it does not exist.
+        """
+        try:
+            return os.stat(THERMOCOUPLES[thermocouple]).st_mtime_ns
+        except OSError:
+            return -1
+
+    def register(self, converter: TEConverter) -> None:
+        """
+        Adds a converter whose tables will be replaced.
+        """
+        self._converters.add(converter)
+
+    def get_new_errors(self) -> list[str]:
+        """
+        Returns the errors that were not returned by the previous calls, so that each error is shown once.
+        """
+        with self._lock:
+            errors = [_ for _ in self.errors.values() if _ not in self._reported]
+            self._reported = set(self.errors.values())
+        return errors
+
+    def _clear_error(self, thermocouple: str) -> None:
+        """
+        Removes the error of the thermocouple, so that it is shown again if it occurs again.
+        """
+        self._reported.discard(self.errors.pop(thermocouple, None))
+
+    def check(self) -> list[str]:
+        """
+        Checks the data files once, reloads the tables whose contents changed
+        and replaces them in the registered converters.
+        Returns the types of thermocouples that were reloaded.
+        """
+        reloaded = []
+        with self._lock:
+            for thermocouple in THERMOCOUPLES:
+                mtime = self._get_mtime(thermocouple)
+                if mtime == self._mtimes.get(thermocouple):
+                    continue
+                current = get_published_table(thermocouple)
+                self._mtimes[thermocouple] = mtime
+                try:
+                    table = ThermocoupleTable(thermocouple)
+                    if current is not None and table.content_hash == current.content_hash:
+                        self._clear_error(thermocouple)
+                        continue
+                    table.validate(current)
+                except (ThermoException, OSError, ValueError, ArithmeticError) as e:
+                    self.errors[thermocouple] = f'The table of {thermocouple} was not reloaded: {e}'
+                    continue
+
+                self._clear_error(thermocouple)
+                publish_table(table)
+                for converter in list(self._converters):
+                    converter.replace_thermocouple_table(table)
+                reloaded.append(thermocouple)
+        return reloaded
+
+    def _run(self):
+        """
+        Checks the data files with the given interval until the watcher is stopped.
+        """
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> None:
+        """
+        Starts watching the data files in a background thread.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops watching the data files.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -1,10 +1,19 @@
+from collections.abc import Iterator
 from decimal import Decimal, ROUND_HALF_UP
+from pathlib import Path
 from random import gauss
+from threading import Lock
 
+import numpy as np
+
+from Converter.calibration import CalibrationRegistry
 from Converter.decorators import try_exc
-from Converter.constants import STANDARD_DEVIATION_TEMP, TEMP_FREE_END, STANDARD_DEVIATION_TEMP_FREE_END
-from Converter.data_classes import Measurement, Result
-from Converter.thermocouple_table import ThermocoupleTable
+from Converter.constants import (COVERAGE_FACTOR, STANDARD_DEVIATION_TEMP, TEMP_FREE_END,
+                                 STANDARD_DEVIATION_TEMP_FREE_END)
+from Converter.data_classes import Measurement, Result, ResultBatch, UncertaintyBatch
+from Converter.thermocouple_table import ThermocoupleTable, get_table, round_half_up
+from Converter.thermoexceptions import ThermoException
+from Converter.tracing import tracer
 
 
 class TEConverter:
@@ -14,10 +23,18 @@ class TEConverter:
     and also generates calculations for a given temperature.
     Contains an object of the ThermocoupleЕable class,
     which can throw a FileNotFoundError exception and others.
+
+    Concurrency contract: one converter can be shared between threads.
+    Tables and calibration registries are immutable snapshots, changing them replaces the reference.
+    Each conversion call takes the snapshots once at its start and uses only them,
+    so all results of one call are calculated by one table, even if another thread
+    changes the type of thermocouple in the meantime; the change affects the calls started after it.
     """
 
     def __init__(self):
-        self._thermocouple_table = ThermocoupleTable()
+        self._thermocouple_table = get_table()
+        self._calibration: CalibrationRegistry | None = None
+        self._lock = Lock()
 
     def get_thermocouple(self):
         """
@@ -25,39 +42,153 @@ class TEConverter:
         """
         return self._thermocouple_table.thermocouple
 
+    def get_thermocouple_table(self) -> ThermocoupleTable:
+        """
+        Returns the current thermocouple table, an immutable snapshot that stays valid after the table is changed.
+        """
+        return self._thermocouple_table
+
     def change_thermocouple_table(self, thermocouple: str) -> str:
         """
-        Changes the type of thermocouple table used.
+        Changes the type of thermocouple table used to the published table of the thermocouple,
+        changes of the data file get into it only through TableWatcher.
         Returns the type of thermocouple.
         """
-        self._thermocouple_table = ThermocoupleTable(thermocouple)
-        return self._thermocouple_table.thermocouple
+        table = get_table(thermocouple)
+        with self._lock:
+            self._thermocouple_table = table
+        return table.thermocouple
+
+    def replace_thermocouple_table(self, table: ThermocoupleTable) -> bool:
+        """
+        Replaces the current table with a new version of the table of the same type of thermocouple.
+        Calls that have already started finish with the previous table.
+        Returns whether the table was replaced.
+        """
+        with self._lock:
+            if self._thermocouple_table.thermocouple != table.thermocouple:
+                return False
+            self._thermocouple_table = table
+            return True
+
+    def load_calibration(self, file_path: Path | str) -> int:
+        """
+        Loads the individual calibration deviations of the sensors from a file.
+        Returns the number of calibrated sensors.
+        """
+        calibration = CalibrationRegistry(file_path)
+        self._calibration = calibration
+        return len(calibration)
+
+    @staticmethod
+    @try_exc
+    def _get_correction(table: ThermocoupleTable, data: Measurement) -> Decimal | str:
+        """
+        Calculates the correction for the free end temperature of the received measurement.
+        """
+        return table.get_thermo_emf(data.temperature)
 
+    @staticmethod
     @try_exc
-    def _calculate_one(self, data: Measurement) -> Result | str:
+    def _calculate_one(table: ThermocoupleTable, data: Measurement, correction: Decimal | str) -> Result | str:
         """
-        Calculates the temperature from the received measurement.
+        Calculates the temperature from the received measurement and its correction.
         """
-        correction = self._thermocouple_table.get_thermo_emf(data.temperature)
+        if isinstance(correction, str):
+            return correction
         result_thermo_emf = correction + data.thermo_emf
-        temperature = self._thermocouple_table.get_temperature(result_thermo_emf)
+        temperature = table.get_temperature(result_thermo_emf)
         return Result(data.temperature, data.thermo_emf, correction, result_thermo_emf, temperature)
 
     def calculate(self, *data: Measurement) -> list[Result|str]:
         """
         Calculates temperatures based on the received measurement list.
+        The corrections of all measurements are calculated first and then the temperatures,
+        so that the forward and inverse lookups are traced as two spans.
+        """
+        table = self._thermocouple_table
+        with tracer.span('calculate', thermocouple=table.thermocouple, size=len(data)):
+            with tracer.span('forward_lookup', size=len(data)):
+                corrections = [self._get_correction(table, _) for _ in data]
+            with tracer.span('inverse_lookup', size=len(data)):
+                return [self._calculate_one(table, *_) for _ in zip(data, corrections)]
+
+    @staticmethod
+    def _calculate_batch(table: ThermocoupleTable, calibration: CalibrationRegistry | None,
+                         temperature_free_end: np.ndarray, thermo_emf: np.ndarray,
+                         sensor_ids: np.ndarray | None = None) -> ResultBatch:
+        """
+        Calculates temperatures for arrays of measurements with the given table and calibration.
+        """
+        temperature_free_end = np.asarray(temperature_free_end, dtype=np.float64)
+        thermo_emf = np.asarray(thermo_emf, dtype=np.float64)
+        with tracer.span('calculate_batch', thermocouple=table.thermocouple, size=thermo_emf.size):
+            with tracer.span('forward_lookup', size=temperature_free_end.size):
+                correction = table.get_thermo_emf_array(temperature_free_end)
+            # Removes the binary error of the sum, so that table values are matched exactly as with Decimal.
+            result_thermo_emf = np.round(correction + thermo_emf, 9)
+            with tracer.span('inverse_lookup', size=result_thermo_emf.size):
+                temperature = table.get_temperature_array(result_thermo_emf)
+            if sensor_ids is not None:
+                if calibration is None:
+                    raise ThermoException('The calibration data of the sensors is not loaded.')
+                with tracer.span('calibration', size=temperature.size, sensors=len(calibration)):
+                    deviation = calibration.get_deviation(sensor_ids, temperature)
+                    temperature = round_half_up(temperature + deviation, 1)
+            return ResultBatch(table.thermocouple, temperature_free_end, thermo_emf,
+                               correction, result_thermo_emf, temperature)
+
+    def calculate_batch(self, temperature_free_end: np.ndarray, thermo_emf: np.ndarray,
+                        sensor_ids: np.ndarray | None = None, table: ThermocoupleTable | None = None) -> ResultBatch:
+        """
+        Calculates temperatures for arrays of measurements in one vectorized pass.
+        If sensor IDs are given, the calibration deviations of the sensors are added to the temperatures.
+        Points outside the range of the thermocouple conversion table get NaN temperature.
+        The table snapshot from get_thermocouple_table can be given to use the same table across several calls.
+        """
+        return self._calculate_batch(self._thermocouple_table if table is None else table, self._calibration,
+                                     temperature_free_end, thermo_emf, sensor_ids)
+
+    def calculate_uncertainty(self, temperature_free_end: np.ndarray, thermo_emf: np.ndarray,
+                              std_free_end: float | np.ndarray = STANDARD_DEVIATION_TEMP_FREE_END,
+                              std_thermo_emf: float | np.ndarray = 0.0,
+                              coverage_factor: float = COVERAGE_FACTOR) -> UncertaintyBatch:
+        """
+        Calculates the expected temperatures and their standard uncertainties for arrays of measurements
+        by propagating the standard deviations of the free end temperature and the thermo-emf
+        through the Seebeck coefficients of the table segments, without sampling.
+        An analytic alternative to the spread obtained by generate.
+        """
+        table = self._thermocouple_table
+        with tracer.span('calculate_uncertainty', thermocouple=table.thermocouple, size=np.size(thermo_emf)):
+            batch = self._calculate_batch(table, None, temperature_free_end, thermo_emf)
+            seebeck_free_end = table.get_seebeck_array(batch.temperature_free_end)
+            seebeck = table.get_seebeck_array(batch.temperature)
+            std_result_thermo_emf = np.hypot(std_thermo_emf, seebeck_free_end * std_free_end)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                uncertainty = np.where(seebeck > 0, std_result_thermo_emf / seebeck, np.nan)
+        return UncertaintyBatch(batch.thermocouple, batch.temperature, uncertainty,
+                                batch.temperature - coverage_factor * uncertainty,
+                                batch.temperature + coverage_factor * uncertainty, coverage_factor)
+
+    def generate_sheet(self, start: Decimal | str, stop: Decimal | str, step: Decimal | str,
+                       inverse: bool = False) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """
+        Generates a reference sheet of the current thermocouple table in pages.
+        The table is taken when the method is called and is used for all pages.
         """
-        return [self._calculate_one(_) for _ in data]
+        return self._thermocouple_table.generate_sheet(start, stop, step, inverse)
 
+    @staticmethod
     @try_exc
-    def _generate_one(self, temp: float, temp_en: float) -> Result | str:
+    def _generate_one(table: ThermocoupleTable, temp: float, temp_en: float) -> Result | str:
         """
         Generates a temperature calculation at a single point.
         """
         temp = Decimal(temp).quantize(Decimal('1.0'), ROUND_HALF_UP)
         temp_en = Decimal(temp_en).quantize(Decimal('1.0'), ROUND_HALF_UP)
-        correction = self._thermocouple_table.get_thermo_emf(temp_en)
-        result_thermo_emf = self._thermocouple_table.get_thermo_emf(temp)
+        correction = table.get_thermo_emf(temp_en)
+        result_thermo_emf = table.get_thermo_emf(temp)
         return Result(temp_en, result_thermo_emf - correction, correction, result_thermo_emf, temp)
 
     def generate(self, temperature: float, quantity: int = 3,
@@ -71,4 +202,6 @@ class TEConverter:
         """
         temperatures = [(gauss(temperature, std_temp),  gauss(temp_free_end, std_free_end))
                         for _ in range(quantity)]
-        return [self._generate_one(*temp) for temp in temperatures]
+        table = self._thermocouple_table
+        with tracer.span('generate', thermocouple=table.thermocouple, size=quantity):
+            return [self._generate_one(table, *temp) for temp in temperatures]
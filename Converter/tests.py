@@ -1,10 +1,29 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 from decimal import Decimal
 
-from Converter.data_classes import Result, Measurement
+import numpy as np
+
+from Converter.constants import SHEET_PAGE_SIZE, THERMOCOUPLES
+from Converter.data_classes import Result, Measurement, ResultBatch, Window
+from Converter.export import export, pyarrow
+from Converter.loadgen import LoadGenerator, emit, format_lines, parse_lines, read_chunks
+from Converter.pyramid import MinMaxPyramid
+from Converter.reloader import TableWatcher
+from Converter.tracing import NULL_SPAN, Tracer, parse_sample_rate, tracer
+from Converter.downsampling import LTTBDecimator, WindowAggregator, convert_stream, downsample
 from Converter.teconverter import TEConverter
 from Converter.thermoexceptions import ThermoException
-from Converter.thermocouple_table import ThermocoupleTable
+from Converter.thermocouple_table import _TABLES, ThermocoupleTable, get_table
+from console_converter import parse_measurements
+from load_test import generate_lines, run_batch, run_console
 
 
 class TermocoupleTableTest(unittest.TestCase):
@@ -23,6 +42,24 @@ class TermocoupleTableTest(unittest.TestCase):
             with self.subTest(data=data):
                 self.assertEqual(self.thermocouple_table.get_temperature(Decimal(data[0])), Decimal(data[1]))
 
+    def test_generate_sheet(self):
+        pages = list(self.thermocouple_table.generate_sheet('1221', '1222', '0.1', page_size=4))
+        self.assertEqual([len(_[0]) for _ in pages], [4, 4, 3])
+        arguments, values = np.concatenate([_[0] for _ in pages]), np.concatenate([_[1] for _ in pages])
+        for argument, value in zip(arguments.tolist(), values.tolist()):
+            with self.subTest(argument=argument):
+                self.assertEqual(Decimal(str(value)),
+                                 self.thermocouple_table.get_thermo_emf(Decimal(str(argument))))
+        arguments, values = next(self.thermocouple_table.generate_sheet('0', '17.942', '0.001', inverse=True))
+        self.assertEqual(len(values), SHEET_PAGE_SIZE)
+        self.assertEqual(Decimal(str(values[-1])), self.thermocouple_table.get_temperature(Decimal('0.049')))
+        self.assertRaises(ThermoException, next, self.thermocouple_table.generate_sheet('0', '18', '0.001', True))
+
+    def test_immutable(self):
+        self.assertRaises(AttributeError, setattr, self.thermocouple_table, 'thermocouple', '')
+        with self.assertRaises(ValueError):
+            self.thermocouple_table._emf_array[0] = 1.0
+
     def test_exceptions(self):
         items = ((ThermoException, self.thermocouple_table.get_thermo_emf, Decimal('-999')),
                 (ThermoException, self.thermocouple_table.get_thermo_emf, Decimal('11800')),
@@ -72,6 +109,498 @@ class TEConverterTest(unittest.TestCase):
     def test_exception(self):
         self.assertRaises(Exception, self.converter.change_thermocouple_table, '')
 
+    def test_calculate_batch(self):
+        batch = self.converter.calculate_batch([float(_.temperature) for _ in self.measurement] + [-5.0],
+                                               [float(_.thermo_emf) for _ in self.measurement] + [1.0])
+        self.assertIsInstance(batch, ResultBatch)
+        self.assertEqual(batch.valid.tolist(), [True, True, True, False])
+        results = batch.to_results()
+        for i in range(len(self.results)):
+            with self.subTest(i=i):
+                self.assertEqual(results[i], self.results[i])
+        self.assertIsInstance(results[-1], str)
+
+    def test_calculate_batch_snapshot(self):
+        table = self.converter.get_thermocouple_table()
+        self.converter.change_thermocouple_table('ТВР ВР(А)-1')
+        self.assertEqual(self.converter.get_thermocouple_table().thermocouple, 'ТВР ВР(А)-1')
+        batch = self.converter.calculate_batch([22.2], [12.0738], table=table)
+        self.assertEqual(batch.thermocouple, table.thermocouple)
+        self.assertEqual(batch.temperature[0], 1221.0)
+
+    def test_calculate_uncertainty(self):
+        table = ThermocoupleTable()
+        uncertainty = self.converter.calculate_uncertainty([22.2, 22.2, -5.0], [12.0738, 12.0738, 1.0],
+                                                           std_free_end=[0.5, 0.0, 0.5], std_thermo_emf=0.002)
+        self.assertEqual(uncertainty.temperature[0], 1221.0)
+        seebeck = float(table.get_seebeck_array(1221.0))
+        self.assertAlmostEqual(uncertainty.uncertainty[0],
+                               float(np.hypot(0.002, 0.5 * table.get_seebeck_array(22.2))) / seebeck)
+        self.assertAlmostEqual(uncertainty.uncertainty[1], 0.002 / seebeck)
+        self.assertAlmostEqual(uncertainty.upper[0] - uncertainty.lower[0], 4 * uncertainty.uncertainty[0])
+        self.assertTrue(np.isnan(uncertainty.uncertainty[2]))
+
+
+class ConcurrencyTest(unittest.TestCase):
+
+    def test_switch_and_convert(self):
+        converter = TEConverter()
+        thermocouples = ('ТПП(S)', 'ТВР ВР(А)-1')
+        measurements = [Measurement(Decimal('22.2'), Decimal(f'{_ / 10:.4f}')) for _ in range(1, 150)]
+        expected = {}
+        for thermocouple in thermocouples:
+            converter.change_thermocouple_table(thermocouple)
+            expected[thermocouple] = (converter.calculate(*measurements),
+                                      converter.calculate_batch([22.2] * 149, [_ / 10 for _ in range(1, 150)]))
+        stop = threading.Event()
+
+        def switch():
+            while not stop.is_set():
+                for thermocouple in thermocouples:
+                    converter.change_thermocouple_table(thermocouple)
+
+        def convert(_):
+            results = converter.calculate(*measurements)
+            batch = converter.calculate_batch([22.2] * 149, [_ / 10 for _ in range(1, 150)])
+            self.assertIn(results, [_[0] for _ in expected.values()])
+            np.testing.assert_array_equal(batch.temperature, expected[batch.thermocouple][1].temperature)
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        switchers = [threading.Thread(target=switch) for _ in range(2)]
+        for thread in switchers: thread.start()
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(convert, range(200)))
+        finally:
+            stop.set()
+            for thread in switchers: thread.join()
+            sys.setswitchinterval(switch_interval)
+
+    def test_one_snapshot_per_call(self):
+        tables = [ThermocoupleTable('ТПП(S)'), ThermocoupleTable('ТВР ВР(А)-1')]
+        expected = {}
+        for table in tables:
+            converter = TEConverter()
+            converter._thermocouple_table = table
+            expected[table.thermocouple] = converter.calculate_uncertainty([22.2] * 3, [1.0, 5.0, 10.0])
+
+        class SwitchingConverter(TEConverter):
+            """
+            Switches the table after each access to it, as another thread could do.
+            """
+
+            @property
+            def _thermocouple_table(self):
+                tables.reverse()
+                return tables[1]
+
+            @_thermocouple_table.setter
+            def _thermocouple_table(self, table):
+                pass
+
+        converter = SwitchingConverter()
+        for _ in range(2):
+            uncertainty = converter.calculate_uncertainty([22.2] * 3, [1.0, 5.0, 10.0])
+            np.testing.assert_array_equal(uncertainty.uncertainty, expected[uncertainty.thermocouple].uncertainty)
+
+
+class CalibrationTest(unittest.TestCase):
+
+    def setUp(self):
+        file, self.file_path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(file, 'w') as file:
+            file.write('# sensor  c0  c1  c2\n'
+                       'S-001  0,5\n'
+                       'S-002  -0,2  0,001  0,000001\n')
+        self.converter = TEConverter()
+
+    def tearDown(self):
+        os.remove(self.file_path)
+
+    def test_load_calibration(self):
+        self.assertEqual(self.converter.load_calibration(self.file_path), 2)
+
+    def test_calculate_batch(self):
+        self.converter.load_calibration(self.file_path)
+        sensors = np.array(['S-002', 'S-001', 'S-999', 'S-002'])
+        batch = self.converter.calculate_batch([22.2] * 4, [12.0738] * 4, sensor_ids=sensors)
+        self.assertEqual(batch.temperature.tolist(), [1223.5, 1221.5, 1221.0, 1223.5])
+
+    def test_calculate_batch_2d(self):
+        self.converter.load_calibration(self.file_path)
+        sensors = np.array(['S-002', 'S-001'])
+        batch = self.converter.calculate_batch(np.full((4, 2), 22.2), np.full((4, 2), 12.0738), sensor_ids=sensors)
+        self.assertEqual(batch.temperature.tolist(), [[1223.5, 1221.5]] * 4)
+        batch = self.converter.calculate_batch(np.full((3, 1), 22.2), np.full((3, 1), 12.0738),
+                                               sensor_ids=[['S-002'], ['S-001'], ['S-999']])
+        self.assertEqual(batch.temperature.tolist(), [[1223.5], [1221.5], [1221.0]])
+
+    def test_exceptions(self):
+        self.assertRaises(ThermoException, self.converter.calculate_batch, [22.2], [12.0738], ['S-001'])
+        self.assertRaises(FileNotFoundError, self.converter.load_calibration, 'missing.txt')
+
+
+class TableWatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        file, self.file_path = tempfile.mkstemp(suffix='.txt')
+        os.close(file)
+        self.write(1)
+        self.thermocouples = patch.dict(THERMOCOUPLES, {'Test': self.file_path})
+        self.thermocouples.start()
+        self.tables = patch.dict(_TABLES)
+        self.tables.start()
+        self.converter = TEConverter()
+        self.converter.change_thermocouple_table('Test')
+        self.watcher = TableWatcher()
+        self.watcher.register(self.converter)
+
+    def tearDown(self):
+        self.tables.stop()
+        self.thermocouples.stop()
+        os.remove(self.file_path)
+
+    def write(self, step: int, length: int = 101):
+        with open(self.file_path, 'w') as file:
+            file.write('\t'.join(f'{i * step / 100:.2f}'.replace('.', ',') for i in range(length)))
+        mtime = os.stat(self.file_path).st_mtime_ns + 10 ** 9
+        os.utime(self.file_path, ns=(mtime, mtime))
+
+    def get_temperature(self) -> Decimal:
+        return self.converter.calculate(Measurement(Decimal('0'), Decimal('0.5')))[0].temperature
+
+    def test_reload(self):
+        self.assertEqual(self.get_temperature(), Decimal('50.0'))
+        self.write(1)
+        self.assertEqual(self.watcher.check(), [])
+        self.write(2)
+        self.assertEqual(self.watcher.check(), ['Test'])
+        self.assertEqual(self.get_temperature(), Decimal('25.0'))
+
+    def test_invalid_tables(self):
+        for step, length in ((-1, 101), (1, 50)):
+            with self.subTest(step=step, length=length):
+                self.write(step, length)
+                self.assertEqual(self.watcher.check(), [])
+                self.assertIn('Test', self.watcher.errors)
+                self.assertEqual(self.get_temperature(), Decimal('50.0'))
+
+    def test_other_thermocouple(self):
+        self.converter.change_thermocouple_table('ТПП(S)')
+        self.write(2)
+        self.assertEqual(self.watcher.check(), ['Test'])
+        self.assertEqual(self.converter.get_thermocouple(), 'ТПП(S)')
+
+    def test_published_tables(self):
+        table = get_table('Test')
+        self.assertIs(ThermocoupleTable('Test')._data_table, table._data_table)
+        self.write(2)
+        self.assertIsNot(ThermocoupleTable('Test')._data_table, table._data_table)
+        self.assertIs(get_table('Test'), table)
+        self.assertEqual(self.watcher.check(), ['Test'])
+        self.assertIsNot(get_table('Test'), table)
+
+    def test_rejected_table(self):
+        self.write(-1)
+        self.assertEqual(self.watcher.check(), [])
+        converter = TEConverter()
+        converter.change_thermocouple_table('Test')
+        self.assertEqual(converter.calculate(Measurement(Decimal('0'), Decimal('0.5')))[0].temperature,
+                         Decimal('50.0'))
+
+    def test_missing_table(self):
+        file_path = os.path.join(tempfile.mkdtemp(), 'missing.txt')
+        self.addCleanup(shutil.rmtree, os.path.dirname(file_path))
+        with patch.dict(THERMOCOUPLES, {'Missing': file_path}):
+            watcher = TableWatcher()
+            watcher.register(self.converter)
+            for values, reloaded in (('0 1 0,5 3', False), ('0 1 2 3', True)):
+                with self.subTest(values=values):
+                    with open(file_path, 'w') as file:
+                        file.write(values)
+                    mtime = os.stat(file_path).st_mtime_ns + 10 ** 9 * (1 + reloaded)
+                    os.utime(file_path, ns=(mtime, mtime))
+                    self.assertEqual(watcher.check(), ['Missing'] if reloaded else [])
+                    self.assertEqual('Missing' in watcher.errors, not reloaded)
+                    if not reloaded:
+                        self.assertRaises(ThermoException, TEConverter().change_thermocouple_table, 'Missing')
+            self.assertEqual(TEConverter().change_thermocouple_table('Missing'), 'Missing')
+
+    def test_new_errors(self):
+        self.write(-1)
+        self.watcher.check()
+        self.assertEqual(len(self.watcher.get_new_errors()), 1)
+        self.assertEqual(self.watcher.get_new_errors(), [])
+        self.write(1)
+        self.watcher.check()
+        self.write(-1)
+        self.watcher.check()
+        self.assertEqual(len(self.watcher.get_new_errors()), 1)
+
+    def test_bundled_table(self):
+        file_path = os.path.join(tempfile.mkdtemp(), 'TPP(S).txt')
+        self.addCleanup(shutil.rmtree, os.path.dirname(file_path))
+        shutil.copy(THERMOCOUPLES['ТПП(S)'], file_path)
+        with patch.dict(THERMOCOUPLES, {'ТПП(S)': file_path}):
+            converter = TEConverter()
+            watcher = TableWatcher()
+            watcher.register(converter)
+            for old, new, reloaded in (('\t9,596\t', '\t9,500\t', False),
+                                       ('\t8504\t', '\t8,504\t', True),
+                                       ('\t9,596\t', '\t9,597\t', True)):
+                with self.subTest(old=old, new=new):
+                    with open(file_path, 'r') as file:
+                        content = file.read()
+                    with open(file_path, 'w') as file:
+                        file.write(content.replace(old, new))
+                    mtime = os.stat(file_path).st_mtime_ns + 10 ** 9
+                    os.utime(file_path, ns=(mtime, mtime))
+                    self.assertEqual(watcher.check(), ['ТПП(S)'] if reloaded else [])
+                    self.assertEqual('ТПП(S)' in watcher.errors, not reloaded)
+                    if not reloaded:
+                        with open(file_path, 'w') as file:
+                            file.write(content)
+            self.assertEqual(converter.get_thermocouple_table().get_thermo_emf(Decimal('905')), Decimal('8.504'))
+            self.assertEqual(converter.get_thermocouple_table().get_thermo_emf(Decimal('1001')), Decimal('9.597'))
+
+
+class TracerTest(unittest.TestCase):
+
+    def test_disabled(self):
+        tracer = Tracer(0.0)
+        self.assertIs(tracer.span('calculate'), NULL_SPAN)
+        with tracer.span('calculate'):
+            pass
+        self.assertEqual(len(tracer.events), 0)
+
+    def test_nested_spans(self):
+        tracer = Tracer(1.0)
+        with tracer.span('calculate', thermocouple='ТПП(S)') as span:
+            with tracer.span('forward_lookup', size=3):
+                pass
+            span.set(size=3)
+        inner, outer = tracer.events
+        self.assertEqual((inner['name'], outer['name']), ('forward_lookup', 'calculate'))
+        self.assertEqual(outer['args'], {'thermocouple': 'ТПП(S)', 'size': 3})
+        self.assertLessEqual(outer['ts'], inner['ts'])
+        self.assertGreaterEqual(outer['ts'] + outer['dur'], inner['ts'] + inner['dur'])
+
+    def test_parse_sample_rate(self):
+        for value, sample_rate in ((None, 0.0), ('', 0.0), ('0,5', 0.0), ('nan', 0.0),
+                                   ('0.5', 0.5), ('2', 1.0), ('-1', 0.0)):
+            with self.subTest(value=value):
+                self.assertEqual(parse_sample_rate(value), sample_rate)
+
+    def test_sampling(self):
+        tracer = Tracer(1e-12)
+        with tracer.span('calculate'):
+            self.assertIs(tracer.span('forward_lookup'), NULL_SPAN)
+        self.assertEqual(len(tracer.events), 0)
+
+    def test_dump(self):
+        tracer = Tracer(1.0)
+        with tracer.span('calculate'):
+            pass
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'trace.json')
+            self.assertEqual(tracer.dump(file_path), 1)
+            with open(file_path, encoding='utf-8') as file:
+                self.assertEqual(json.load(file)['traceEvents'][0]['ph'], 'X')
+
+    def test_calculate_spans(self):
+        measurements = [Measurement(Decimal('22.2'), Decimal('12.0738')), Measurement(Decimal('-5'), Decimal('1'))]
+        converter = TEConverter()
+        with patch.object(tracer, 'sample_rate', 1.0), patch.object(tracer, 'events', []):
+            results = converter.calculate(*measurements)
+            self.assertEqual([(_['name'], _['args']['size']) for _ in tracer.events],
+                             [('forward_lookup', 2), ('inverse_lookup', 2), ('calculate', 2)])
+        self.assertIsInstance(results[0], Result)
+        self.assertIsInstance(results[1], str)
+
+
+class DownsamplingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.converter = TEConverter()
+        timestamps = np.arange(100) / 10
+        thermo_emf = np.where(np.arange(100) % 2, 12.0738, 12.0642)
+        thermo_emf[5] = 100.0
+        temperature_free_end = np.full(100, 22.2)
+        self.chunks = [(timestamps[i:i+7], temperature_free_end[i:i+7], thermo_emf[i:i+7])
+                       for i in range(0, 100, 7)]
+
+    def test_fixed_windows(self):
+        windows = list(downsample(convert_stream(self.converter, self.chunks), WindowAggregator(1.0)))
+        self.assertEqual(len(windows), 10)
+        self.assertEqual(windows[0], Window(0.0, 1.0, 9, windows[0].mean, 1220.2, 1221.0, windows[0].delta))
+        self.assertAlmostEqual(windows[1].mean, 1220.6)
+        self.assertAlmostEqual(windows[1].delta, 0.8)
+
+    def test_sliding_windows(self):
+        windows = list(downsample(convert_stream(self.converter, self.chunks), WindowAggregator(2.0, 0.5)))
+        self.assertEqual([_.start for _ in windows], [_ * 0.5 for _ in range(20)])
+        self.assertEqual(windows[0].count, 19)
+        self.assertEqual(windows[-1].count, 5)
+
+    def test_gaps(self):
+        chunks = [(np.array([0.0, 0.0005, 3600.0]), np.full(3, 22.2), np.full(3, 12.0738)),
+                  (np.array([50000.0, 50000.0015]), np.full(2, 22.2), np.full(2, 12.0642))]
+        windows = list(downsample(convert_stream(self.converter, chunks), WindowAggregator(0.002, 0.001)))
+        self.assertEqual([(round(_.start, 3), _.count) for _ in windows],
+                         [(0.0, 2), (3599.999, 1), (3600.0, 1), (49999.999, 1), (50000.0, 2), (50000.001, 1)])
+
+    def test_lttb(self):
+        points = list(downsample(convert_stream(self.converter, self.chunks), LTTBDecimator(10)))
+        self.assertEqual(len(points), 12)
+        self.assertEqual(points[0], (0.0, 1220.2))
+        self.assertEqual(points[-1], (9.9, 1221.0))
+
+    def test_exceptions(self):
+        self.assertRaises(ThermoException, WindowAggregator, 1.0, 2.0)
+        self.assertRaises(ThermoException, LTTBDecimator, 0)
+        self.assertRaises(ThermoException, LTTBDecimator, 10, 'thermocouple')
+
+
+class MinMaxPyramidTest(unittest.TestCase):
+
+    def setUp(self):
+        self.x = np.arange(1000, dtype=np.float64)
+        self.y = np.sin(self.x / 50)
+        self.y[500] = np.nan
+        self.pyramid = MinMaxPyramid(self.x, self.y)
+
+    def test_levels(self):
+        self.assertEqual(self.pyramid.levels, 11)
+        self.assertEqual(self.pyramid.get_range(), (0.0, 999.0, float(np.nanmin(self.y)), float(np.nanmax(self.y))))
+
+    def test_query(self):
+        x, y = self.pyramid.query(0, 999, 100)
+        self.assertLessEqual(len(x), 4 * 100)
+        self.assertEqual((np.nanmin(y), np.nanmax(y)), (np.nanmin(self.y), np.nanmax(self.y)))
+        x, y = self.pyramid.query(100, 150, 100)
+        np.testing.assert_array_equal(x, self.x[99:152])
+
+    def test_exceptions(self):
+        self.assertRaises(ThermoException, MinMaxPyramid, self.x, self.y[1:])
+
+
+class LoadGeneratorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.converter = TEConverter()
+        self.table = ThermocoupleTable()
+
+    def test_chunks(self):
+        generator = LoadGenerator(self.table, 1200.0, channels=4, rate=100.0, drift=10.0, seed=1)
+        chunks = list(generator.chunks(1.0, chunk_size=30))
+        self.assertEqual([len(_[0]) for _ in chunks], [30, 30, 30, 10])
+        timestamps, temperature_free_end, thermo_emf = chunks[-1]
+        self.assertEqual(thermo_emf.shape, (10, 4))
+        self.assertAlmostEqual(timestamps[-1], 0.99)
+        batch = self.converter.calculate_batch(temperature_free_end.ravel(), thermo_emf.ravel())
+        self.assertTrue(batch.valid.all())
+        self.assertLess(abs(np.mean(batch.temperature) - 1209.5), 3.0)
+
+    def test_bursts(self):
+        generator = LoadGenerator(self.table, 1200.0, channels=2, burst_probability=1.0, seed=1)
+        _, temperature_free_end, thermo_emf = next(generator.chunks(0.01))
+        self.assertFalse(self.converter.calculate_batch(temperature_free_end.ravel(), thermo_emf.ravel()).valid.any())
+
+    def test_range_edges(self):
+        for temperature in (0.0, 1700.0, 1767.0):
+            with self.subTest(temperature=temperature):
+                generator = LoadGenerator(self.table, temperature, channels=4, std_temp=5.0, seed=1)
+                _, temperature_free_end, thermo_emf = next(generator.chunks(1.0))
+                self.assertFalse(np.isnan(thermo_emf).any())
+                self.assertNotIn('nan', format_lines(temperature_free_end, thermo_emf))
+
+    def test_console_and_batch(self):
+        generator = LoadGenerator(self.table, 10.0, channels=4, std_temp=20.0, burst_probability=0.01, seed=1)
+        lines = list(generate_lines(generator, 0.2)) + ['22.4--0.0706 22,4-1,5']
+        temperature_free_end, thermo_emf = parse_lines(lines)
+        measurements = [_ for line in lines for _ in parse_measurements(line)]
+        self.assertEqual([float(_.thermo_emf) for _ in measurements], thermo_emf.tolist())
+        self.assertEqual([float(_.temperature) for _ in measurements], temperature_free_end.tolist())
+        self.assertGreaterEqual(thermo_emf[:-2].min(), 0.0)
+
+        results = self.converter.calculate(*measurements)
+        batch = self.converter.calculate_batch(temperature_free_end, thermo_emf)
+        self.assertEqual([_.temperature if isinstance(_, Result) else None for _ in results],
+                         [Decimal(str(_)) if valid else None for _, valid in zip(batch.temperature.tolist(),
+                                                                                  batch.valid.tolist())])
+        console, batch = run_console(self.converter, lines), run_batch(self.converter, read_chunks(lines, 50))
+        self.assertEqual((console.samples, console.errors), (batch.samples, batch.errors))
+        self.assertGreater(console.errors, 0)
+
+    def test_format_lines(self):
+        self.assertEqual(format_lines(np.array([[22.2, 22.7]]), np.array([[12.0738, 12.0576]])),
+                         '22.2-12.0738 22.7-12.0576\n')
+
+    def test_read_chunks(self):
+        generator = LoadGenerator(self.table, 1200.0, channels=3, seed=1)
+        _, temperature_free_end, thermo_emf = next(generator.chunks(0.005))
+        lines = format_lines(temperature_free_end, thermo_emf).splitlines(keepends=True) + ['\n']
+        chunks = list(read_chunks(lines, chunk_size=2))
+        self.assertEqual([len(_[0]) for _ in chunks], [6, 6, 3])
+        np.testing.assert_array_equal(np.concatenate([_[0] for _ in chunks]), temperature_free_end.ravel())
+        np.testing.assert_array_equal(np.concatenate([_[1] for _ in chunks]), thermo_emf.ravel())
+
+    def test_emit(self):
+        generator = LoadGenerator(self.table, 1200.0, channels=3, rate=100.0, seed=1)
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'stream.txt')
+            self.assertEqual(emit(generator, file_path, 0.5), 50)
+            with open(file_path) as file:
+                lines = file.read().splitlines()
+        self.assertEqual(len(lines), 50)
+        self.assertEqual(len(lines[0].split()), 3)
+
+
+class ExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.batch = TEConverter().calculate_batch([22.2, -1.0, 22.7], [12.0738, 1.0, 12.0576])
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_npy(self):
+        file_path = os.path.join(self.directory.name, 'results.npy')
+        export(self.batch, file_path)
+        array = np.load(file_path)
+        np.testing.assert_array_equal(array['temperature'], self.batch.temperature)
+        self.assertEqual(array.dtype.fields['correction'][2], 'ТПП(S): correction, mV')
+
+    def test_npz(self):
+        file_path = os.path.join(self.directory.name, 'results.npz')
+        export(self.batch, file_path)
+        with np.load(file_path) as arrays:
+            self.assertEqual(str(arrays['thermocouple']), 'ТПП(S)')
+            np.testing.assert_array_equal(arrays['result_thermo_emf'], self.batch.result_thermo_emf)
+
+    def test_csv(self):
+        file_path = os.path.join(self.directory.name, 'results.csv')
+        export(self.batch, file_path)
+        with open(file_path, encoding='utf-8') as file:
+            self.assertEqual(file.read(), '# thermocouple: ТПП(S)\n'
+                                          'temperature_free_end,thermo_emf,correction,result_thermo_emf,temperature\n'
+                                          '22.200,12.073800,0.1262,12.200000,1221.0\n'
+                                          '-1.000,1.000000,,,\n'
+                                          '22.700,12.057600,0.1292,12.186800,1219.9\n')
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_parquet(self):
+        file_path = os.path.join(self.directory.name, 'results.parquet')
+        export(self.batch, file_path)
+        table = pyarrow.parquet.read_table(file_path)
+        self.assertEqual(table.schema.metadata[b'thermocouple'].decode(), 'ТПП(S)')
+        np.testing.assert_array_equal(table['temperature'].to_numpy(), self.batch.temperature)
+
+    def test_exceptions(self):
+        self.assertRaises(ThermoException, export, self.batch, os.path.join(self.directory.name, 'results.txt'))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,36 +1,125 @@
 from bisect import bisect_left
+from collections.abc import Iterator
 from decimal import Decimal, ROUND_HALF_UP
+from hashlib import sha256
+from threading import Lock
 
-from Converter.constants import THERMOCOUPLES, DEFAULT_THERMOCOUPLE
+import numpy as np
+
+from Converter.constants import THERMOCOUPLES, DEFAULT_THERMOCOUPLE, SHEET_PAGE_SIZE
 from Converter.thermoexceptions import ThermoException
+from Converter.tracing import tracer
+
+
+# Compensates for the binary representation of decimal fractions when rounding half up.
+ROUNDING_EPS: float = 1e-6
+
+# The published table of each thermocouple, None if the first loading of the table failed.
+_TABLES: dict[str, 'ThermocoupleTable | None'] = {}
+_TABLES_LOCK = Lock()
+
+
+def round_half_up(values: np.ndarray, digits: int) -> np.ndarray:
+    """
+    Rounds the array values to the given number of decimal places
+    in the same way as Decimal.quantize with ROUND_HALF_UP.
+    """
+    scale = 10.0 ** digits
+    return np.sign(values) * np.floor(np.abs(values) * scale + 0.5 + ROUNDING_EPS) / scale
+
+
+def bisect_left_array(table: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Returns the insertion points of the values into the table,
+    making the same steps as bisect_left for each value,
+    so that the result matches it even in sections of the table that are not sorted.
+    """
+    lo = np.zeros(values.shape, dtype=np.intp)
+    hi = np.full(values.shape, len(table), dtype=np.intp)
+    for _ in range(len(table).bit_length()):
+        active = lo < hi
+        mid = (lo + hi) // 2
+        less = table[np.minimum(mid, len(table) - 1)] < values
+        lo = np.where(active & less, mid + 1, lo)
+        hi = np.where(active & ~less, mid, hi)
+    return lo
 
 
 class ThermocoupleTable:
     """
     The class contains a type of thermocouple,
     a table for converting temperature to thermal energy
-    at a free-end temperature of 0 degrees Celsius
+    at a free-end temperature of 0 degrees Celsius.
+    The table is an immutable snapshot of the data file:
+    it is not changed after loading and can be shared between threads.
     """
 
     def __init__(self, thermocouple: str = DEFAULT_THERMOCOUPLE):
-        self.thermocouple = thermocouple
+        self._thermocouple = thermocouple
+        self.content_hash = ''
         self._data_table = self._load_data()
+        self._emf_array = np.array(self._data_table, dtype=np.float64)
+        self._emf_array.flags.writeable = False
+        # The Seebeck coefficient of each one-degree segment of the table, mV/°C.
+        self._seebeck_array = np.diff(self._emf_array)
+        self._seebeck_array.flags.writeable = False
+
+    @property
+    def thermocouple(self) -> str:
+        """
+        Returns the type of thermocouple.
+        """
+        return self._thermocouple
 
-    def _load_data(self) -> list[Decimal]:
+    def _load_data(self) -> tuple[Decimal, ...]:
         """
         Loads the thermal efficiency values for a specific type of thermocouple from a file.
+        The file is not parsed if it has the same contents as the published table of the thermocouple.
         It can throw a FileNotFoundError exception if the data file does not exist.
         """
-        result = []
         file_path = THERMOCOUPLES.get(self.thermocouple, '')
-        try:
-            with open(file_path, 'r') as file:
-                for line in file:
-                    line = line.replace(',', '.')
-                    result.extend([Decimal(_) for _ in line.split()])
-            return result
-        except FileNotFoundError:
-            raise FileNotFoundError(f'The file - {file_path}  does not exist.')
+        with tracer.span('load_table', thermocouple=self.thermocouple) as span:
+            try:
+                with open(file_path, 'rb') as file:
+                    content = file.read()
+            except FileNotFoundError:
+                raise FileNotFoundError(f'The file - {file_path}  does not exist.')
+
+            self.content_hash = sha256(content).hexdigest()
+            published = _TABLES.get(self.thermocouple)
+            cached = published is not None and published.content_hash == self.content_hash
+            span.set(cached=cached)
+            if cached:
+                return published._data_table
+            result = []
+            for line in content.decode().splitlines():
+                line = line.replace(',', '.')
+                result.extend([Decimal(_) for _ in line.split()])
+            return tuple(result)
+
+    def __len__(self):
+        return len(self._data_table)
+
+    def validate(self, reference: 'ThermocoupleTable | None' = None) -> None:
+        """
+        Checks that the thermo-emf values of the table increase with the temperature.
+        If the reference table is given, the table should contain the same number of values as the reference,
+        and its values may fail to increase only at the temperatures where the values of the reference do not increase,
+        so a new version of a table is not rejected for the irregularities it inherited.
+        Throws an exception - ThermoException if the table is not valid.
+        """
+        if len(self._data_table) < 2:
+            raise ThermoException(f'The table of {self.thermocouple} should contain at least two values.')
+        if reference is not None and len(self._data_table) != len(reference):
+            raise ThermoException(f'The table of {self.thermocouple} should contain {len(reference)} values. '
+                                  f'Current number of values: {len(self._data_table)}.')
+        decreasing = np.flatnonzero(np.diff(self._emf_array) <= 0)
+        if reference is not None:
+            decreasing = np.setdiff1d(decreasing, np.flatnonzero(np.diff(reference._emf_array) <= 0))
+        if len(decreasing):
+            raise ThermoException(f'The thermo-emf values of the table of {self.thermocouple} should increase. '
+                                  f'The values do not increase at temperatures: '
+                                  f'{", ".join(str(_ + 1) for _ in decreasing[:10])}.')
 
     def get_thermo_emf(self, temperature: Decimal)->Decimal:
         """
@@ -75,3 +164,120 @@ class ThermocoupleTable:
             delta = next_emf - prev_emf
             return (index-1 + diff/delta).quantize(Decimal('1.0'), ROUND_HALF_UP)
         return Decimal(index).quantize(Decimal('1.0'))
+
+    def get_curve(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the temperatures and the thermo-emf values of the table points.
+        """
+        return np.arange(len(self._emf_array), dtype=np.float64), self._emf_array
+
+    def get_thermo_emf_array(self, temperature: np.ndarray) -> np.ndarray:
+        """
+        Returns the thermal efficiency values for an array of temperatures.
+        The vectorized version of get_thermo_emf with the same rounding,
+        temperatures outside the range of the thermocouple conversion table give NaN.
+        """
+        temperature = np.asarray(temperature, dtype=np.float64)
+        last = len(self._emf_array) - 1
+        inside = (temperature >= 0) & (temperature <= last)
+        temperature = np.where(inside, temperature, 0.0)
+
+        index_prev = np.floor(temperature).astype(np.intp)
+        index_next = np.minimum(index_prev + 1, last)
+        emf_prev = self._emf_array[index_prev]
+        step = self._emf_array[index_next] - emf_prev
+        delta = temperature - index_prev
+        return np.where(inside, round_half_up(emf_prev + step * delta, 4), np.nan)
+
+    def get_temperature_array(self, thermo_emf: np.ndarray) -> np.ndarray:
+        """
+        Returns the temperature values for an array of thermo-emf.
+        The vectorized version of get_temperature with the same rounding,
+        thermo-emf outside the range of the thermocouple conversion table give NaN.
+        """
+        thermo_emf = np.asarray(thermo_emf, dtype=np.float64)
+        inside = (thermo_emf >= 0) & (thermo_emf <= self._emf_array[-1])
+        thermo_emf = np.where(inside, thermo_emf, 0.0)
+
+        index = np.minimum(bisect_left_array(self._emf_array, thermo_emf), len(self._emf_array) - 1)
+        next_emf = self._emf_array[index]
+        prev_emf = self._emf_array[np.maximum(index - 1, 0)]
+        exact = next_emf == thermo_emf
+        delta = np.where(exact, 1.0, next_emf - prev_emf)
+        temperature = np.where(exact, index, index - 1 + (thermo_emf - prev_emf) / delta)
+        return np.where(inside, round_half_up(temperature, 1), np.nan)
+
+    def get_seebeck_array(self, temperature: np.ndarray) -> np.ndarray:
+        """
+        Returns the Seebeck coefficients, mV/°C, of the table segments containing the temperatures.
+        Temperatures outside the range of the thermocouple conversion table give NaN.
+        """
+        temperature = np.asarray(temperature, dtype=np.float64)
+        last = len(self._seebeck_array) - 1
+        inside = (temperature >= 0) & (temperature <= last + 1)
+        index = np.minimum(np.floor(np.where(inside, temperature, 0.0)).astype(np.intp), last)
+        return np.where(inside, self._seebeck_array[index], np.nan)
+
+    def generate_sheet(self, start: Decimal | str, stop: Decimal | str, step: Decimal | str,
+                       inverse: bool = False,
+                       page_size: int = SHEET_PAGE_SIZE) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """
+        Generates a reference sheet from start to stop inclusive with the given step:
+        thermo-emf for temperatures, or temperatures for thermo-emf if inverse is set.
+        Yields pages of arguments and values, each page is calculated in one vectorized pass
+        with the same rounding as get_thermo_emf and get_temperature.
+        Throws an exception - ThermoException
+        if the range is outside the range of the thermocouple conversion table.
+        """
+        start, stop, step = Decimal(start), Decimal(stop), Decimal(step)
+        limit = self._data_table[-1] if inverse else len(self._data_table) - 1
+        if step <= 0 or not 0 <= start <= stop <= limit:
+            raise ThermoException(f'The sheet range should be in the range from 0 to {limit} '
+                                  f'{"mV" if inverse else "degrees Celsius"} with a positive step. '
+                                  f'Current range: from {start} to {stop} with step {step}.')
+
+        # Arguments are calculated from integers, so that they do not accumulate the error of the step.
+        decimals = max(-start.as_tuple().exponent, -step.as_tuple().exponent, 0)
+        scale = 10 ** decimals
+        first, increment = int(start * scale), int(step * scale)
+        count = int((stop - start) / step) + 1
+        convert = self.get_temperature_array if inverse else self.get_thermo_emf_array
+        for begin in range(0, count, page_size):
+            arguments = (first + increment * np.arange(begin, min(begin + page_size, count), dtype=np.int64)) / scale
+            yield arguments, convert(arguments)
+
+
+def get_published_table(thermocouple: str) -> ThermocoupleTable | None:
+    """
+    Returns the published table of the thermocouple without loading it, None if it is not published.
+    """
+    with _TABLES_LOCK:
+        return _TABLES.get(thermocouple)
+
+
+def get_table(thermocouple: str = DEFAULT_THERMOCOUPLE) -> ThermocoupleTable:
+    """
+    Returns the published table of the thermocouple, the table converters use.
+    The table loaded at the first use of the thermocouple is published as it is.
+    If that loading failed, the table is loaded again and published only if it is valid.
+    Later versions of the data file are published by TableWatcher after validation.
+    Throws the exceptions of loading and validating the table.
+    """
+    with _TABLES_LOCK:
+        table = _TABLES.get(thermocouple)
+        if table is None:
+            first = thermocouple not in _TABLES
+            _TABLES[thermocouple] = None
+            table = ThermocoupleTable(thermocouple)
+            if not first:
+                table.validate()
+            _TABLES[thermocouple] = table
+        return table
+
+
+def publish_table(table: ThermocoupleTable) -> None:
+    """
+    Makes the validated table the published table of its thermocouple.
+    """
+    with _TABLES_LOCK:
+        _TABLES[table.thermocouple] = table
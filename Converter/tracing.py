@@ -0,0 +1,149 @@
+import json
+import os
+from collections import deque
+from pathlib import Path
+from random import random
+from threading import get_ident, local
+from time import perf_counter_ns
+
+from Converter.constants import MAX_TRACE_EVENTS, TRACE_FILE, TRACE_SAMPLE_RATE
+
+
+class _NullSpan:
+    """
+    The span of a call that is not sampled, does nothing.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _UnsampledSpan(_NullSpan):
+    """
+    The outermost span of a call that is not sampled,
+    marks the thread so that the nested spans are not sampled either.
+    """
+
+    def __init__(self, state: local):
+        self._state = state
+
+    def __enter__(self):
+        self._state.depth = 1
+        self._state.sampled = False
+        return self
+
+    def __exit__(self, *exc):
+        self._state.depth = 0
+        return False
+
+
+class Span:
+    """
+    A sampled span, records its name, arguments, start time and duration
+    as a complete event of the Chrome trace format.
+    """
+
+    def __init__(self, tracer: 'Tracer', name: str, args: dict):
+        self._tracer = tracer
+        self.name = name
+        self.args = args
+        self._start = 0
+
+    def __enter__(self):
+        state = self._tracer._state
+        if not getattr(state, 'depth', 0):
+            state.sampled = True
+        state.depth = getattr(state, 'depth', 0) + 1
+        self._start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = perf_counter_ns()
+        self._tracer._state.depth -= 1
+        if exc[0] is not None:
+            self.args['error'] = f'{exc[0].__name__}: {exc[1]}'
+        self._tracer.events.append({'name': self.name, 'ph': 'X', 'ts': self._start / 1000,
+                                    'dur': (end - self._start) / 1000, 'pid': os.getpid(),
+                                    'tid': get_ident(), 'args': self.args})
+        return False
+
+    def set(self, **args) -> None:
+        """
+        Adds arguments to the span, for example sizes that are known only inside it.
+        """
+        self.args.update(args)
+
+
+class Tracer:
+    """
+    Records nested spans of the conversion stages with monotonic timestamps.
+    Sampling is decided by the outermost span of a call in a thread, the spans nested in it follow the decision.
+    If the sample rate is zero, a span costs one comparison.
+    The recorded events can be saved to a JSON file for Chrome's trace viewer or Perfetto.
+    """
+
+    def __init__(self, sample_rate: float = TRACE_SAMPLE_RATE, max_events: int = MAX_TRACE_EVENTS):
+        self.sample_rate = sample_rate
+        self.events: deque[dict] = deque(maxlen=max_events)
+        self._state = local()
+
+    def configure(self, sample_rate: float) -> None:
+        """
+        Sets the share of calls to sample, from 0 (tracing is off) to 1 (every call).
+        """
+        self.sample_rate = sample_rate
+
+    def span(self, name: str, **args) -> Span | _NullSpan:
+        """
+        Returns the context manager of a span with the given name and arguments.
+        """
+        if self.sample_rate <= 0:
+            return NULL_SPAN
+        state = self._state
+        if getattr(state, 'depth', 0):
+            return Span(self, name, args) if state.sampled else NULL_SPAN
+        if random() < self.sample_rate:
+            return Span(self, name, args)
+        return _UnsampledSpan(state)
+
+    def clear(self) -> None:
+        """
+        Removes the recorded events.
+        """
+        self.events.clear()
+
+    def dump(self, file_path: Path | str = TRACE_FILE) -> int:
+        """
+        Saves the recorded events to a file in the Chrome trace format.
+        Returns the number of saved events.
+        """
+        events = list(self.events)
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file, ensure_ascii=False)
+        return len(events)
+
+
+def parse_sample_rate(value: str | None) -> float:
+    """
+    Converts the sample rate from the environment variable to a number from 0 to 1.
+    A missing or malformed value gives the default sample rate.
+    """
+    try:
+        sample_rate = float(value)
+    except (TypeError, ValueError):
+        return TRACE_SAMPLE_RATE
+    if sample_rate != sample_rate:
+        return TRACE_SAMPLE_RATE
+    return min(max(sample_rate, 0.0), 1.0)
+
+
+tracer = Tracer(parse_sample_rate(os.environ.get('TECONVERTER_TRACE_SAMPLE_RATE')))
@@ -1,10 +1,15 @@
 from decimal import Decimal
 from re import findall, fullmatch, search
 
+import numpy as np
+
 from Converter.data_classes import Measurement, Result
-from Converter.constants import (QUANTITY, STANDARD_DEVIATION_TEMP, TEMP_FREE_END,
+from Converter.constants import (MEASUREMENT_PATTERN, QUANTITY, STANDARD_DEVIATION_TEMP, TEMP_FREE_END,
                                  STANDARD_DEVIATION_TEMP_FREE_END, THERMOCOUPLES)
+from Converter.reloader import TableWatcher
 from Converter.teconverter import TEConverter
+from Converter.thermoexceptions import ThermoException
+from Converter.tracing import tracer
 
 
 # For float and int
@@ -17,6 +22,13 @@ def out_result(results: list[str | Result]) -> str:
     then the row will consist of list objects,
     otherwise the row will look like a table with calculated values.
     """
+    with tracer.span('out_result', size=len(results)):
+        return _out_result(results)
+
+def _out_result(results: list[str | Result]) -> str:
+    """
+    Renders the list of results for out_result.
+    """
     if all([isinstance(_, Result) for _ in results]):
         res_len = len(results)
         lines = 25
@@ -35,19 +47,37 @@ def out_result(results: list[str | Result]) -> str:
         return message
     return '\n'.join((str(res) for res in results))
 
+def out_sheet(arguments: np.ndarray, values: np.ndarray, decimals: int, inverse: bool = False) -> str:
+    """
+    Creates a row for a page of the reference sheet in the form of a table.
+    """
+    units = ('Thermo-emf, mV', 'Temperature, °C') if inverse else ('Temperature, °C', 'Thermo-emf, mV')
+    message = f'{units[0]:25}{units[1]}\n{"-" * 50}\n'
+    message += '\n'.join(f'{argument:<25.{decimals}f}{value:.{1 if inverse else 4}f}'
+                          for argument, value in zip(arguments.tolist(), values.tolist()))
+    return message
+
+def parse_measurements(data: str) -> list[Measurement]:
+    """
+    Parses the measured values entered in a format like this 22.4-0.1274.
+    """
+    with tracer.span('parse_input', length=len(data)) as span:
+        temps = findall(MEASUREMENT_PATTERN, data.replace(',', '.'))
+        span.set(size=len(temps))
+        return [Measurement(*(Decimal(_) for _ in temp)) for temp in temps]
+
 def _calculate(con: TEConverter) -> None:
     """
     The handler for the calculate command.
     """
     data = input('Enter the measured values in a format like this 22.4-0.1274: ')
-    temps = data.replace(',', '.')
-    temps = findall(r'(-?\d+[.]?\d*)\s*-+\s*(-?\d+[.]?\d*)', temps)
-    if temps:
-        measurements = (Measurement(*(Decimal(_) for _ in temp)) for temp in temps)
-        res = con.calculate(*measurements)
-        print(out_result(res))
-    else:
-        print(f'Incorrect data entry format: {data}.')
+    with tracer.span('console_calculate', thermocouple=con.get_thermocouple()):
+        measurements = parse_measurements(data)
+        if measurements:
+            res = con.calculate(*measurements)
+            print(out_result(res))
+        else:
+            print(f'Incorrect data entry format: {data}.')
 
 
 def _generate(con: TEConverter) -> None:
@@ -80,6 +110,25 @@ def _generate_extend(con: TEConverter) -> None:
     res = con.generate(**params)
     print(out_result(res))
 
+def _sheet(con: TEConverter) -> None:
+    """
+    The handler for the reference sheet command.
+    """
+    inverse = input('Enter the type of sheet (t - temperature to thermo-emf, '
+                    'e - thermo-emf to temperature): ') == 'e'
+    params = [input(f'Enter {param}, {"mV" if inverse else "°C"}: ').replace(',', '.')
+              for param in ('start', 'stop', 'step')]
+    if not all(fullmatch(PATTERN, _) for _ in params):
+        print('Incorrect sheet range entered.')
+        return
+    decimals = max(-Decimal(params[0]).as_tuple().exponent, -Decimal(params[2]).as_tuple().exponent, 0)
+    try:
+        for number, (arguments, values) in enumerate(con.generate_sheet(*params, inverse=inverse), 1):
+            print(f'Page {number}')
+            print(out_sheet(arguments, values, decimals, inverse))
+    except ThermoException as e:
+        print(f'Input data error: {e}')
+
 def _change_thermocouple_table(con: TEConverter) -> None:
     """
     The handler for the change thermocouple table.
@@ -92,13 +141,18 @@ def _change_thermocouple_table(con: TEConverter) -> None:
         print(f'This type of thermocouple - {thermocouple} is not supported')
 
 
-def console_converter(con: TEConverter) -> None:
+def console_converter(con: TEConverter, watcher: TableWatcher | None = None) -> None:
     """
     Processes commands entered by the user and outputs the result to the console.
+    If the table watcher is given, its new errors are shown before each command.
     """
     while True:
+        if watcher is not None:
+            for error in watcher.get_new_errors():
+                print(error)
         cmd = input(f'Select the operating mode (e - exit, c - calculate, g - generate, '
-                    f'ge - generate with additional parameters, t - change thermocouple): ')
+                    f'ge - generate with additional parameters, s - reference sheet, '
+                    f't - change thermocouple): ')
         match cmd:
             case 'c':
                 _calculate(con)
@@ -106,6 +160,8 @@ def console_converter(con: TEConverter) -> None:
                 _generate(con)
             case 'ge':
                 _generate_extend(con)
+            case 's':
+                _sheet(con)
             case 't':
                 _change_thermocouple_table(con)
             case 'e'| '\x1b':
@@ -116,9 +172,15 @@ def console_converter(con: TEConverter) -> None:
 def console_main():
     try:
         converter = TEConverter()
-        console_converter(converter)
+        watcher = TableWatcher()
+        watcher.register(converter)
+        watcher.start()
+        console_converter(converter, watcher)
     except (Exception, KeyboardInterrupt) as exc:
         print(exc)
+    finally:
+        if tracer.events:
+            tracer.dump()
 
 if __name__ == '__main__':
     console_main()
@@ -1,13 +1,19 @@
 from decimal import Decimal
 from re import fullmatch
+from threading import Thread
 
+import numpy as np
 import wx
 from wx.lib.agw.buttonpanel import BoxSizer
 
 from Converter.constants import TEMP_FREE_END, STANDARD_DEVIATION_TEMP_FREE_END
 from Converter.constants import THERMOCOUPLES, DEFAULT_THERMOCOUPLE, QUANTITY, STANDARD_DEVIATION_TEMP
+from Converter.constants import RELOAD_INTERVAL
 from Converter.data_classes import Measurement, Result
+from Converter.pyramid import MinMaxPyramid
+from Converter.reloader import TableWatcher
 from Converter.teconverter import TEConverter
+from Converter.tracing import tracer
 
 LINKS: list[str] = list(THERMOCOUPLES.keys())
 DEFAULT_INDEX = LINKS.index(DEFAULT_THERMOCOUPLE)
@@ -21,6 +27,10 @@ BORDER: int = 10
 DELTA_MESSAGE: str = f'∆T  ='
 LINE: str = '\u2500' * 5
 PATTERN: str = r'[+-]?([0-9]+([.][0-9]*)?|[.][0-9]+)'
+PLOT_SERIES: list[str] = ['Temperature, °C', 'Thermo-emf, mV', 'Table curve']
+PLOT_MARGIN: int = 60
+ZOOM_FACTOR: float = 1.25
+MEASUREMENT_FILES: str = 'Measurements (*.txt;*.csv;*.npz)|*.txt;*.csv;*.npz'
 
 
 class FloatPointValidator(wx.Validator):
@@ -255,6 +265,13 @@ class BasePanel(wx.Panel):
         """
         Outputs the result of a calculation or generation.
         """
+        with tracer.span('output_results', thermocouple=self.converter.get_thermocouple(), size=len(results)):
+            self._output_results(results, generate)
+
+    def _output_results(self, results: list[Result | str], generate: bool = False):
+        """
+        Sets the results to the panels and the difference of temperatures.
+        """
         for panel, res in zip(self.panels, results):
             if isinstance(res, Result):
                 if generate:
@@ -425,6 +442,288 @@ class GenPanel(BasePanel):
 
 
 
+def read_measurements(file_path: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reads the free end temperatures and the thermo-emf from a file.
+    A .npz file must contain the temperature_free_end and thermo_emf arrays,
+    a .csv file has a header line with these column names, as written by export_csv, '#' starts a comment line,
+    a text file contains a pair of values per line separated by whitespace or semicolons.
+    """
+    if file_path.lower().endswith('.npz'):
+        with np.load(file_path) as arrays:
+            return arrays['temperature_free_end'], arrays['thermo_emf']
+    if file_path.lower().endswith('.csv'):
+        with open(file_path, 'r') as file:
+            lines = [line for line in file if line.strip() and not line.lstrip().startswith('#')]
+        if not lines:
+            raise ValueError(f'The file {file_path} has no header line.')
+        header = [name.strip() for name in lines[0].split(',')]
+        if 'temperature_free_end' not in header or 'thermo_emf' not in header:
+            raise ValueError(f'The file {file_path} should have the temperature_free_end and thermo_emf columns.')
+        values = np.loadtxt(lines[1:], delimiter=',', ndmin=2,
+                            usecols=(header.index('temperature_free_end'), header.index('thermo_emf')))
+        return values[:, 0], values[:, 1]
+    with open(file_path, 'r') as file:
+        values = np.array(file.read().replace(',', '.').replace(';', ' ').split(), dtype=np.float64)
+    if len(values) % 2:
+        raise ValueError(f'The file {file_path} should contain pairs of values.')
+    values = values.reshape(-1, 2)
+    return values[:, 0], values[:, 1]
+
+
+class PlotCanvas(wx.Panel):
+    """
+    Draws series from min/max pyramids, so that each redraw uses about as many points as there are pixels.
+    The mouse wheel zooms, dragging pans, double click resets the view.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.SetBackgroundStyle(wx.BG_STYLE_PAINT)
+
+        self.series: list[tuple[MinMaxPyramid, wx.Colour]] = []
+        self._view: tuple[float, float] | None = None
+        self._drag: tuple[int, tuple[float, float]] | None = None
+
+        self.Bind(wx.EVT_PAINT, self._on_paint)
+        self.Bind(wx.EVT_SIZE, lambda event: self.Refresh())
+        self.Bind(wx.EVT_MOUSEWHEEL, self._on_wheel)
+        self.Bind(wx.EVT_LEFT_DOWN, self._on_left_down)
+        self.Bind(wx.EVT_LEFT_UP, self._on_left_up)
+        self.Bind(wx.EVT_MOTION, self._on_motion)
+        self.Bind(wx.EVT_LEFT_DCLICK, lambda event: self.reset_view())
+
+    def set_series(self, series: list[tuple[MinMaxPyramid, wx.Colour]]):
+        """
+        Sets the series to draw and resets the view.
+        """
+        self.series = [_ for _ in series if len(_[0])]
+        self.reset_view()
+
+    def reset_view(self):
+        """
+        Shows the whole range of the series.
+        """
+        ranges = [pyramid.get_range() for pyramid, _ in self.series]
+        self._view = (min(_[0] for _ in ranges), max(_[1] for _ in ranges)) if ranges else None
+        self.Refresh()
+
+    def _get_area(self) -> wx.Rect:
+        """
+        Returns the rectangle of the plot area.
+        """
+        width, height = self.GetClientSize()
+        return wx.Rect(PLOT_MARGIN, BORDER, max(width - PLOT_MARGIN - BORDER * 2, 1),
+                       max(height - PLOT_MARGIN, 1))
+
+    def _to_x(self, pixel: int) -> float:
+        """
+        Converts the horizontal pixel position to the x value.
+        """
+        area = self._get_area()
+        x_min, x_max = self._view
+        return x_min + (pixel - area.x) * (x_max - x_min) / area.width
+
+    def _on_paint(self, event):
+        """
+        Draws the axes and the visible part of the series.
+        """
+        dc = wx.AutoBufferedPaintDC(self)
+        dc.SetBackground(wx.WHITE_BRUSH)
+        dc.Clear()
+        area = self._get_area()
+        dc.SetPen(wx.LIGHT_GREY_PEN)
+        dc.DrawRectangle(area)
+        if self._view is None:
+            return
+
+        x_min, x_max = self._view
+        points = [(pyramid.query(x_min, x_max, area.width), colour) for pyramid, colour in self.series]
+        values = np.concatenate([y for (_, y), _ in points])
+        if not len(values) or np.isnan(values).all():
+            return
+        y_min, y_max = float(np.nanmin(values)), float(np.nanmax(values))
+        if y_min == y_max:
+            y_min, y_max = y_min - 1, y_max + 1
+        x_scale = area.width / ((x_max - x_min) or 1)
+        y_scale = area.height / (y_max - y_min)
+
+        dc.SetClippingRegion(area)
+        for (x, y), colour in points:
+            dc.SetPen(wx.Pen(colour))
+            valid = ~np.isnan(y)
+            pixels_x = np.rint(area.x + (x[valid] - x_min) * x_scale).astype(int)
+            pixels_y = np.rint(area.y + area.height - (y[valid] - y_min) * y_scale).astype(int)
+            if len(pixels_x) > 1:
+                dc.DrawLines(list(zip(pixels_x.tolist(), pixels_y.tolist())))
+        dc.DestroyClippingRegion()
+
+        dc.SetTextForeground(wx.BLACK)
+        dc.DrawText(f'{y_max:.4g}', BORDER // 2, area.y)
+        dc.DrawText(f'{y_min:.4g}', BORDER // 2, area.y + area.height - BORDER * 2)
+        dc.DrawText(f'{x_min:.6g}', area.x, area.y + area.height + BORDER // 2)
+        label = f'{x_max:.6g}'
+        dc.DrawText(label, area.x + area.width - dc.GetTextExtent(label).width, area.y + area.height + BORDER // 2)
+
+    def _on_wheel(self, event):
+        """
+        Zooms the view around the mouse position.
+        """
+        if self._view is None:
+            return
+        factor = 1 / ZOOM_FACTOR if event.GetWheelRotation() > 0 else ZOOM_FACTOR
+        center = self._to_x(event.GetX())
+        x_min, x_max = self._view
+        self._view = (center - (center - x_min) * factor, center + (x_max - center) * factor)
+        self.Refresh()
+
+    def _on_left_down(self, event):
+        """
+        Starts panning the view.
+        """
+        if self._view is not None:
+            self._drag = (event.GetX(), self._view)
+            self.CaptureMouse()
+
+    def _on_left_up(self, event):
+        """
+        Stops panning the view.
+        """
+        if self._drag is not None:
+            self._drag = None
+            if self.HasCapture():
+                self.ReleaseMouse()
+
+    def _on_motion(self, event):
+        """
+        Pans the view while the left button is held down.
+        """
+        if self._drag is None or not event.Dragging():
+            return
+        start, (x_min, x_max) = self._drag
+        shift = (start - event.GetX()) * (x_max - x_min) / self._get_area().width
+        self._view = (x_min + shift, x_max + shift)
+        self.Refresh()
+
+
+class PlotPanel(BasePanel):
+    """
+    The panel for plotting the converted temperature and thermo-emf series of a measurement file
+    and the table curve of the thermocouple.
+    The pyramids of the series are built once per dataset in a background thread.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._measurements: tuple[np.ndarray, np.ndarray] | None = None
+        self._pyramids: dict[str, list[tuple[MinMaxPyramid, wx.Colour]]] = {}
+        self._build_id = 0
+
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
+
+        hbox.Add(wx.StaticText(self, label='Type of thermocouple:'), flag=wx.ALL, border=BORDER)
+        thermocouples = wx.ComboBox(self, choices=LINKS, style=wx.CB_READONLY)
+        thermocouples.SetSelection(DEFAULT_INDEX)
+        thermocouples.Bind(wx.EVT_COMBOBOX, self._change_converter)
+        hbox.Add(thermocouples, flag=wx.RIGHT, border=BORDER * 3)
+
+        hbox.Add(wx.StaticText(self, label='Series:'), flag=wx.ALL, border=BORDER)
+        self.series = wx.Choice(self, choices=PLOT_SERIES)
+        self.series.SetSelection(len(PLOT_SERIES) - 1)
+        self.series.Bind(wx.EVT_CHOICE, lambda event: self._show_series())
+        hbox.Add(self.series, flag=wx.RIGHT, border=BORDER * 3)
+
+        button = wx.Button(self, label='Open...')
+        button.Bind(wx.EVT_BUTTON, self._open)
+        hbox.Add(button)
+
+        self.vbox.Add(hbox, flag=wx.ALL, border=BORDER)
+
+        self.status = wx.StaticText(self, label='')
+        self.vbox.Add(self.status, flag=wx.LEFT | wx.RIGHT, border=BORDER * 2)
+
+        self.canvas = PlotCanvas(self)
+        self.vbox.Add(self.canvas, proportion=1, flag=wx.ALL | wx.EXPAND, border=BORDER)
+
+        self._build()
+
+    def _change_converter(self, event):
+        """
+        Changes the converter type and rebuilds the series.
+        """
+        super()._change_converter(event)
+        self._build()
+
+    def _open(self, event):
+        """
+        The handler that loads the measurements from a file.
+        """
+        with wx.FileDialog(self, 'Open measurements', wildcard=MEASUREMENT_FILES,
+                           style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as dialog:
+            if dialog.ShowModal() == wx.ID_CANCEL:
+                return
+            file_path = dialog.GetPath()
+        self._build(file_path)
+
+    def _build(self, file_path: str | None = None):
+        """
+        Starts building the pyramids of the series in a background thread.
+        """
+        self._build_id += 1
+        self.status.SetLabel('Building...')
+        Thread(target=self._build_pyramids, args=(self._build_id, file_path), daemon=True).start()
+
+    def _build_pyramids(self, build_id: int, file_path: str | None):
+        """
+        Reads and converts the measurements and builds the pyramids of the series.
+        Runs in a background thread, the result is passed to the GUI thread.
+        """
+        try:
+            measurements = read_measurements(file_path) if file_path else self._measurements
+            table = self.converter.get_thermocouple_table()
+            pyramids = {PLOT_SERIES[2]: [(MinMaxPyramid(*table.get_curve()), wx.BLUE)]}
+            if measurements is not None:
+                batch = self.converter.calculate_batch(*measurements, table=table)
+                index = np.arange(len(batch), dtype=np.float64)
+                pyramids[PLOT_SERIES[0]] = [(MinMaxPyramid(index, batch.temperature), wx.RED)]
+                pyramids[PLOT_SERIES[1]] = [(MinMaxPyramid(index, batch.result_thermo_emf), wx.BLUE)]
+                order = np.argsort(batch.temperature[batch.valid])
+                pyramids[PLOT_SERIES[2]].append((MinMaxPyramid(batch.temperature[batch.valid][order],
+                                                               batch.result_thermo_emf[batch.valid][order]),
+                                                 wx.RED))
+            wx.CallAfter(self._set_pyramids, build_id, measurements, pyramids)
+        except Exception as e:
+            wx.CallAfter(self._set_error, build_id, f'Error building the plot: {e}')
+
+    def _set_pyramids(self, build_id: int, measurements: tuple[np.ndarray, np.ndarray] | None,
+                      pyramids: dict[str, list[tuple[MinMaxPyramid, wx.Colour]]]):
+        """
+        Shows the built pyramids, if no newer build was started.
+        """
+        if build_id != self._build_id:
+            return
+        self._measurements = measurements
+        self._pyramids = pyramids
+        self.status.SetLabel(f'Points: {len(measurements[0]) if measurements is not None else 0}')
+        self._show_series()
+
+    def _set_error(self, build_id: int, message: str):
+        """
+        Shows the error of building, if no newer build was started.
+        """
+        if build_id != self._build_id:
+            return
+        self.status.SetLabel('')
+        wx.MessageBox(message, 'Error', style=wx.OK)
+
+    def _show_series(self):
+        """
+        Draws the selected series.
+        """
+        self.canvas.set_series(self._pyramids.get(self.series.GetStringSelection(), []))
+
+
 class TEConverterFrame(wx.Frame):
     """
     The main window.
@@ -442,12 +741,45 @@ class TEConverterFrame(wx.Frame):
         self.generate_panel = GenPanel(tabs)
         tabs.InsertPage(1, self.generate_panel, 'Generate')
 
+        self.plot_panel = PlotPanel(tabs)
+        tabs.InsertPage(2, self.plot_panel, 'Plot')
+
+        self.CreateStatusBar()
+        self._watcher: TableWatcher | None = None
+        self._watch_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self._on_watch_timer, self._watch_timer)
+
+    def watch_tables(self, watcher: TableWatcher):
+        """
+        Registers the converters of the tabs in the table watcher and shows its new errors.
+        """
+        self._watcher = watcher
+        for panel in (self.calc_panel, self.generate_panel, self.plot_panel):
+            watcher.register(panel.converter)
+        self._watch_timer.Start(int(RELOAD_INTERVAL * 1000))
+
+    def _on_watch_timer(self, event):
+        """
+        Shows the errors of reloading the tables that appeared since the last check.
+        """
+        errors = self._watcher.get_new_errors()
+        if errors:
+            self.SetStatusText(errors[-1])
+            self._watch_timer.Stop()
+            wx.MessageBox('\n'.join(errors), 'Error', style=wx.OK)
+            self._watch_timer.Start()
+
 
 def gui_main():
     app = wx.App()
     frame = TEConverterFrame(parent=None, title='TEConverter')
+    watcher = TableWatcher()
+    frame.watch_tables(watcher)
+    watcher.start()
     frame.Show()
     app.MainLoop()
+    if tracer.events:
+        tracer.dump()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,151 @@
+import sys
+from argparse import ArgumentParser
+from collections.abc import Iterable, Iterator
+from time import perf_counter
+
+import numpy as np
+
+from Converter.constants import (LOAD_CHANNELS, LOAD_CHUNK_SIZE, LOAD_RATE, STANDARD_DEVIATION_TEMP,
+                                 STANDARD_DEVIATION_TEMP_FREE_END, TEMP_FREE_END, THERMOCOUPLES,
+                                 DEFAULT_THERMOCOUPLE)
+from Converter.data_classes import LoadReport, Result
+from Converter.loadgen import LoadGenerator, emit, format_lines, open_source, read_chunks
+from Converter.teconverter import TEConverter
+from console_converter import out_result, parse_measurements
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def get_peak_memory() -> float | None:
+    """
+    Returns the peak resident memory of the process in MB, if the platform reports it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def _report(mode: str, samples: int, errors: int, skipped: int, latencies: list[float],
+            duration: float) -> LoadReport:
+    """
+    Creates the report from the latencies of the calls and the wall-clock duration of the run, in seconds.
+    """
+    latencies = np.array(latencies)
+    return LoadReport(mode, samples, len(latencies), errors, skipped, duration,
+                      samples / duration if duration else 0.0,
+                      float(np.percentile(latencies, 50)) * 1000 if len(latencies) else 0.0,
+                      float(np.percentile(latencies, 99)) * 1000 if len(latencies) else 0.0,
+                      get_peak_memory())
+
+
+def generate_lines(generator: LoadGenerator, duration: float) -> Iterator[str]:
+    """
+    Yields the lines of the stream generated in process, in the console input format.
+    """
+    for _, temperature_free_end, thermo_emf in generator.chunks(duration):
+        yield from format_lines(temperature_free_end, thermo_emf).splitlines()
+
+
+def generate_chunks(generator: LoadGenerator, duration: float,
+                    chunk_size: int = LOAD_CHUNK_SIZE) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    Yields the samples of the stream generated in process as flat arrays.
+    """
+    for _, temperature_free_end, thermo_emf in generator.chunks(duration, chunk_size):
+        yield temperature_free_end.ravel(), thermo_emf.ravel()
+
+
+def run_console(converter: TEConverter, lines: Iterable[str]) -> LoadReport:
+    """
+    Drives the console calculate path: each line of the stream is parsed, calculated and rendered.
+    The throughput is measured over the wall-clock time of consuming the stream, including its generation
+    or reading, the latencies are measured for the calls only. Lines without measurements are skipped.
+    """
+    samples, errors, skipped, latencies = 0, 0, 0, []
+    start = perf_counter()
+    for line in lines:
+        call_start = perf_counter()
+        measurements = parse_measurements(line)
+        if not measurements:
+            skipped += 1
+            continue
+        results = converter.calculate(*measurements)
+        out_result(results)
+        latencies.append(perf_counter() - call_start)
+        samples += len(results)
+        errors += sum(not isinstance(_, Result) for _ in results)
+    return _report('console', samples, errors, skipped, latencies,
+                   perf_counter() - start)
+
+
+def run_batch(converter: TEConverter, chunks: Iterable[tuple[np.ndarray, np.ndarray]]) -> LoadReport:
+    """
+    Drives the batch path: each chunk of the stream is calculated in one call.
+    The throughput is measured over the wall-clock time of consuming the stream, including its generation
+    or reading, the latencies are measured for the calls only.
+    """
+    samples, errors, latencies = 0, 0, []
+    start = perf_counter()
+    for temperature_free_end, thermo_emf in chunks:
+        call_start = perf_counter()
+        batch = converter.calculate_batch(temperature_free_end, thermo_emf)
+        latencies.append(perf_counter() - call_start)
+        samples += len(batch)
+        errors += int((~batch.valid).sum())
+    return _report('batch', samples, errors, 0, latencies,
+                   perf_counter() - start)
+
+
+def load_test_main(args: list[str] | None = None):
+    parser = ArgumentParser(description='Generates synthetic measurement streams and load-tests the converter.')
+    parser.add_argument('command', choices=('generate', 'run'),
+                        help='generate - write a stream, run - measure the throughput of the converter')
+    parser.add_argument('--mode', choices=('console', 'batch'), default='batch',
+                        help='the entry point driven by the run command')
+    parser.add_argument('--target', default='-',
+                        help='the output of the generate command: - (standard output), a file path or tcp://host:port')
+    parser.add_argument('--source', default=None,
+                        help='the stream read by the run command: - (standard input), a file path '
+                             'or tcp://host:port to listen on; by default the stream is generated in process')
+    parser.add_argument('--thermocouple', choices=list(THERMOCOUPLES), default=DEFAULT_THERMOCOUPLE)
+    parser.add_argument('--duration', type=float, default=10.0, help='the duration of the stream, s')
+    parser.add_argument('--channels', type=int, default=LOAD_CHANNELS)
+    parser.add_argument('--rate', type=float, default=LOAD_RATE, help='samples per second of each channel')
+    parser.add_argument('--chunk-size', type=int, default=LOAD_CHUNK_SIZE, help='samples per chunk')
+    parser.add_argument('--temperature', type=float, default=1200.0, help='°C')
+    parser.add_argument('--std-temp', type=float, default=STANDARD_DEVIATION_TEMP, help='°C')
+    parser.add_argument('--temp-free-end', type=float, default=TEMP_FREE_END, help='°C')
+    parser.add_argument('--std-free-end', type=float, default=STANDARD_DEVIATION_TEMP_FREE_END, help='°C')
+    parser.add_argument('--drift', type=float, default=0.0, help='the drift of the temperature, °C/s')
+    parser.add_argument('--burst-probability', type=float, default=0.0,
+                        help='the probability of an out-of-range burst starting at a sample')
+    parser.add_argument('--burst-length', type=int, default=10, help='samples in a burst')
+    parser.add_argument('--realtime', action='store_true', help='pace the generated stream at its rate')
+    parser.add_argument('--seed', type=int, default=None)
+    params = parser.parse_args(args)
+
+    converter = TEConverter()
+    converter.change_thermocouple_table(params.thermocouple)
+    generator = LoadGenerator(converter.get_thermocouple_table(), params.temperature, params.channels,
+                              params.rate, params.std_temp, params.temp_free_end, params.std_free_end,
+                              params.drift, params.burst_probability, params.burst_length, params.seed)
+    if params.command == 'generate':
+        emit(generator, params.target, params.duration, params.realtime, params.chunk_size)
+    elif params.source is not None:
+        with open_source(params.source) as source:
+            if params.mode == 'console':
+                print(run_console(converter, source))
+            else:
+                print(run_batch(converter, read_chunks(source, params.chunk_size)))
+    elif params.mode == 'console':
+        print(run_console(converter, generate_lines(generator, params.duration)))
+    else:
+        print(run_batch(converter, generate_chunks(generator, params.duration, params.chunk_size)))
+
+
+if __name__ == '__main__':
+    load_test_main()